@@ -6,11 +6,10 @@ Demonstrates both CLI and Desktop GUI interfaces
 
 import sys
 import os
+import runpy
 from pathlib import Path
 
-def show_banner():
-    """Display the Terminal Jarvis banner"""
-    banner = """
+_BANNER = """
 ╔══════════════════════════════════════════════════════════════╗
 ║                    Terminal Jarvis v0.1.0                    ║
 ║              Local LLM with Desktop GUI & CLI                ║
@@ -23,19 +22,26 @@ Choose your interface:
 3. 🧪  Demo Mode (Mock LLM - No Model Required)
 4. ❌  Exit
 
+
+"""
+
+_GUI_FEATURES = """Launching Desktop GUI...
+Features:
+  • Transparent window with modern dark theme
+  • Pip mode (always on top)
+  • Minimizable and draggable
+  • Model management and conversation saving
+  • Streaming responses
+
 """
-    print(banner)
+
+def show_banner():
+    """Display the Terminal Jarvis banner"""
+    sys.stdout.write(_BANNER)
 
 def run_desktop_gui():
     """Launch the desktop GUI"""
-    print("Launching Desktop GUI...")
-    print("Features:")
-    print("  • Transparent window with modern dark theme")
-    print("  • Pip mode (always on top)")
-    print("  • Minimizable and draggable")
-    print("  • Model management and conversation saving")
-    print("  • Streaming responses")
-    print()
+    sys.stdout.write(_GUI_FEATURES)
     
     try:
         from jarvis.desktop_app import main as desktop_main
@@ -66,7 +72,7 @@ def run_demo_mode():
     print()
     
     try:
-        exec(open('test_demo.py').read())
+        runpy.run_path(str(Path(__file__).parent / "test_demo.py"), run_name="__main__")
     except Exception as e:
         print(f"Error running demo: {e}")
 
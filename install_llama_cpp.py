@@ -4,13 +4,34 @@ Install llama.cpp for Terminal Jarvis
 Supports Windows, Mac, and Linux
 """
 
+import io
 import os
 import sys
 import subprocess
 import platform
+import shutil
+import threading
+import time
+import urllib.request
 import webbrowser
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Seconds a verify_installation probe result is reused
+VERIFY_TTL = 30.0
+_verify_cache = {"ts": 0.0, "val": None}
+
+# Parallel HTTP range requests used for a pre-built download
+DOWNLOAD_PARTS = 8
+# Where download_prebuilt unpacks the binaries
+PREBUILT_DIR = Path.home() / "llama.cpp"
+# Source checkout used by build_from_source, relative to where we run
+SOURCE_DIR = "llama.cpp"
+# Build output lines kept for the failure message
+BUILD_TAIL_LINES = 20
+
 def detect_os():
     """Detect the operating system"""
     system = platform.system().lower()
@@ -26,8 +47,9 @@ def detect_os():
 def check_winget():
     """Check if winget is available on Windows"""
     try:
-        result = subprocess.run(["winget", "--version"], 
-                              capture_output=True, timeout=5)
+        # Only the exit code matters, so no pipes to read
+        result = subprocess.run(["winget", "--version"], stdin=subprocess.DEVNULL,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=5)
         return result.returncode == 0
     except (subprocess.TimeoutExpired, FileNotFoundError):
         return False
@@ -35,17 +57,28 @@ def check_winget():
 def check_brew():
     """Check if brew is available on Mac/Linux"""
     try:
-        result = subprocess.run(["brew", "--version"], 
-                              capture_output=True, timeout=5)
+        # Only the exit code matters, so no pipes to read
+        result = subprocess.run(["brew", "--version"], stdin=subprocess.DEVNULL,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=5)
         return result.returncode == 0
     except (subprocess.TimeoutExpired, FileNotFoundError):
         return False
 
-def install_windows():
+def probe_package_managers():
+    """Start the winget and brew checks concurrently in the background;
+    returns their futures by name"""
+    pool = ThreadPoolExecutor(max_workers=2)
+    probes = {"winget": pool.submit(check_winget), "brew": pool.submit(check_brew)}
+    # Let the checks finish on their own without blocking the caller
+    pool.shutdown(wait=False)
+    return probes
+
+def install_windows(winget_probe=None):
     """Install llama.cpp on Windows"""
     print("Installing llama.cpp on Windows...")
     
-    if check_winget():
+    has_winget = winget_probe.result() if winget_probe else check_winget()
+    if has_winget:
         print("Using winget to install llama.cpp...")
         try:
             result = subprocess.run(["winget", "install", "llama.cpp"], 
@@ -67,11 +100,12 @@ def install_windows():
         print("Download from: https://github.com/microsoft/winget-cli")
         return False
 
-def install_mac_linux():
+def install_mac_linux(brew_probe=None):
     """Install llama.cpp on Mac/Linux"""
     print("Installing llama.cpp on Mac/Linux...")
     
-    if check_brew():
+    has_brew = brew_probe.result() if brew_probe else check_brew()
+    if has_brew:
         print("Using brew to install llama.cpp...")
         try:
             result = subprocess.run(["brew", "install", "llama.cpp"], 
@@ -93,13 +127,40 @@ def install_mac_linux():
         print("Install from: https://brew.sh")
         return False
 
+def _run_streamed(cmd, cwd, timeout):
+    """Run cmd echoing its output line by line; returns the exit code and the
+    last BUILD_TAIL_LINES lines, so a long build is never held in memory"""
+    process = subprocess.Popen(cmd, cwd=cwd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                               stderr=subprocess.STDOUT, text=True, bufsize=1)
+    # Reading blocks, so a timer enforces the deadline
+    timed_out = threading.Event()
+    
+    def kill():
+        timed_out.set()
+        process.kill()
+    
+    timer = threading.Timer(timeout, kill)
+    timer.start()
+    tail = deque(maxlen=BUILD_TAIL_LINES)
+    try:
+        for line in process.stdout:
+            print(line, end="")
+            tail.append(line)
+        returncode = process.wait()
+    finally:
+        timer.cancel()
+        process.stdout.close()
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    return returncode, tail
+
 def build_from_source():
     """Build llama.cpp from source"""
     print("Building llama.cpp from source...")
     
     try:
         # Clone repository
-        if not Path("llama.cpp").exists():
+        if not os.path.isdir(SOURCE_DIR):
             print("Cloning llama.cpp repository...")
             result = subprocess.run(["git", "clone", "https://github.com/ggerganov/llama.cpp.git"], 
                                   capture_output=True, text=True, timeout=300)
@@ -107,21 +168,19 @@ def build_from_source():
                 print(f"❌ Failed to clone repository: {result.stderr}")
                 return False
         
-        # Change to llama.cpp directory
-        os.chdir("llama.cpp")
-        
-        # Build
+        # Build inside llama.cpp via cwd= rather than changing our own directory
         print("Building llama.cpp...")
-        result = subprocess.run(["cmake", "-B", "build"], 
+        result = subprocess.run(["cmake", "-B", "build"], cwd=SOURCE_DIR,
                               capture_output=True, text=True, timeout=300)
         if result.returncode != 0:
             print(f"❌ CMake configuration failed: {result.stderr}")
             return False
         
-        result = subprocess.run(["cmake", "--build", "build", "--config", "Release"], 
-                              capture_output=True, text=True, timeout=600)
-        if result.returncode != 0:
-            print(f"❌ Build failed: {result.stderr}")
+        # Compile on every core, showing progress as it happens
+        returncode, tail = _run_streamed(["cmake", "--build", "build", "--config", "Release",
+                                          "-j", str(os.cpu_count() or 4)], cwd=SOURCE_DIR, timeout=600)
+        if returncode != 0:
+            print(f"❌ Build failed: {''.join(tail)}")
             return False
         
         print("✅ llama.cpp built successfully from source!")
@@ -149,34 +208,99 @@ def download_prebuilt():
         print("❌ Unsupported operating system for pre-built binaries")
         return False
     
+    try:
+        bin_dir = download_prebuilt_auto(url, PREBUILT_DIR)
+        print(f"✅ Pre-built binaries extracted to {bin_dir}")
+        print(f"Add {bin_dir} to your PATH to use them from new terminals")
+        return True
+    except Exception as e:
+        print(f"❌ Automatic download failed: {e}")
+    
     print(f"Please download from: {url}")
     print("Extract the files and add them to your PATH")
     webbrowser.open(url)
     return True
 
+def _fetch_range(url, start, end, buf):
+    """Download bytes start..end (inclusive) of url into buf"""
+    request = urllib.request.Request(url, headers={"Range": f"bytes={start}-{end}"})
+    with urllib.request.urlopen(request, timeout=60) as response:
+        if response.status != 206:
+            raise IOError(f"server ignored the range request ({response.status})")
+        data = response.read()
+    if len(data) != end - start + 1:
+        raise IOError(f"short read for bytes {start}-{end}")
+    buf[start:end + 1] = data
+
+def _download(url):
+    """Download url, in DOWNLOAD_PARTS concurrent ranges when the server allows it"""
+    head = urllib.request.Request(url, method="HEAD")
+    with urllib.request.urlopen(head, timeout=30) as response:
+        # Ranges go to the final URL, not through the redirects again
+        final_url = response.geturl()
+        size = int(response.headers.get("Content-Length") or 0)
+        ranged = response.headers.get("Accept-Ranges", "").lower() == "bytes"
+    
+    if not ranged or size < DOWNLOAD_PARTS:
+        with urllib.request.urlopen(final_url, timeout=60) as response:
+            return response.read()
+    
+    buf = bytearray(size)
+    part = -(-size // DOWNLOAD_PARTS)
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_PARTS) as pool:
+        futures = [pool.submit(_fetch_range, final_url, start, min(start + part, size) - 1, buf)
+                   for start in range(0, size, part)]
+        for future in futures:
+            future.result()
+    return bytes(buf)
+
+def download_prebuilt_auto(url, dest):
+    """Download and unpack a pre-built zip into dest; returns the directory
+    holding the binaries, which is also added to this process's PATH"""
+    dest = Path(dest)
+    dest.mkdir(parents=True, exist_ok=True)
+    print(f"Downloading {url}...")
+    
+    with zipfile.ZipFile(io.BytesIO(_download(url))) as archive:
+        archive.extractall(dest)
+        # zipfile drops permission bits, so restore the executable ones
+        for info in archive.infolist():
+            mode = info.external_attr >> 16
+            if mode & 0o111:
+                os.chmod(dest / info.filename, mode & 0o777)
+    
+    # Archives keep the binaries at the top or under build/bin
+    server = next(dest.rglob("llama-server*"), None) or next(dest.rglob("llama-cli*"), None)
+    bin_dir = server.parent if server else dest
+    os.environ["PATH"] = os.environ.get("PATH", "") + os.pathsep + str(bin_dir)
+    return bin_dir
+
+def invalidate_cache():
+    """Forget the last installation probe, e.g. after installing"""
+    _verify_cache["ts"] = 0.0
+    _verify_cache["val"] = None
+
+def _find_installed_binary():
+    """Name of the first llama.cpp binary on PATH, or "" if there is none"""
+    now = time.monotonic()
+    if _verify_cache["val"] is not None and now - _verify_cache["ts"] < VERIFY_TTL:
+        return _verify_cache["val"]
+    
+    # A PATH lookup answers this without launching either binary
+    found = next((binary for binary in ("llama-server", "llama-cli") if shutil.which(binary)), "")
+    
+    _verify_cache["ts"] = now
+    _verify_cache["val"] = found
+    return found
+
 def verify_installation():
     """Verify llama.cpp installation"""
     print("\nVerifying installation...")
     
-    try:
-        # Check llama-server
-        result = subprocess.run(["llama-server", "--help"], 
-                              capture_output=True, timeout=5)
-        if result.returncode == 0:
-            print("✅ llama-server found")
-            return True
-    except (subprocess.TimeoutExpired, FileNotFoundError):
-        pass
-    
-    try:
-        # Check llama-cli
-        result = subprocess.run(["llama-cli", "--help"], 
-                              capture_output=True, timeout=5)
-        if result.returncode == 0:
-            print("✅ llama-cli found")
-            return True
-    except (subprocess.TimeoutExpired, FileNotFoundError):
-        pass
+    binary = _find_installed_binary()
+    if binary:
+        print(f"✅ {binary} found")
+        return True
     
     print("❌ llama.cpp not found in PATH")
     return False
@@ -194,6 +318,9 @@ def main():
         print("✅ llama.cpp is already installed!")
         return 0
     
+    # Look for winget and brew while the menu waits for a choice
+    manager_probes = probe_package_managers()
+    
     print("\nInstallation options:")
     print("1. Auto-install (winget/brew)")
     print("2. Build from source")
@@ -206,9 +333,9 @@ def main():
     
     if choice == "1":
         if os_name == "windows":
-            success = install_windows()
+            success = install_windows(manager_probes["winget"])
         elif os_name in ["mac", "linux"]:
-            success = install_mac_linux()
+            success = install_mac_linux(manager_probes["brew"])
         else:
             print("❌ Auto-install not supported on this OS")
     
@@ -235,6 +362,8 @@ def main():
         print("\n" + "="*40)
         print("Installation completed!")
         
+        # The probe from before installing is stale now
+        invalidate_cache()
         if verify_installation():
             print("✅ llama.cpp is ready to use!")
             print("\nYou can now run: python launch_advanced.py")
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+import argparse
+import sys
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Sequence
 
-import click
 from prompt_toolkit import PromptSession
 from prompt_toolkit.history import InMemoryHistory
 from rich.console import Console
@@ -15,17 +16,32 @@ from .chat import LocalLlm, ChatSession
 
 console = Console()
 
+# Characters of streamed output buffered before each terminal write
+STREAM_FLUSH_CHARS = 16
 
-@click.command()
-@click.option("--model", type=click.Path(exists=True, dir_okay=False, path_type=Path), help="Path to GGUF model file")
-@click.option("--ctx", "context_length", type=int, default=4096, show_default=True, help="Context window tokens")
-@click.option("--gpu-layers", "gpu_layers", type=int, default=0, show_default=True, help="Number of layers offloaded to GPU")
-@click.option("--n-gpu-layers", "gpu_layers_alias", type=int, default=None, help="Alias for --gpu-layers")
-@click.option("--threads", type=int, default=None, help="CPU threads to use")
-@click.option("--save", "save_path", type=click.Path(dir_okay=False, path_type=Path), default=None, help="Path to save transcript JSONL")
-@click.option("--temperature", type=float, default=0.7, show_default=True, help="Sampling temperature")
-@click.option("--max-tokens", type=int, default=1024, show_default=True, help="Max new tokens per response")
-def main(
+
+def _build_parser() -> argparse.ArgumentParser:
+	p = argparse.ArgumentParser(prog="jarvis")
+	p.add_argument("--model", type=Path, default=None, help="Path to GGUF model file")
+	p.add_argument("--ctx", dest="context_length", type=int, default=4096, help="Context window tokens (default: 4096)")
+	p.add_argument("--gpu-layers", dest="gpu_layers", type=int, default=0, help="Number of layers offloaded to GPU (default: 0)")
+	p.add_argument("--n-gpu-layers", dest="gpu_layers_alias", type=int, default=None, help="Alias for --gpu-layers")
+	p.add_argument("--threads", type=int, default=None, help="CPU threads to use")
+	p.add_argument("--save", dest="save_path", type=Path, default=None, help="Path to save transcript JSONL")
+	p.add_argument("--temperature", type=float, default=0.7, help="Sampling temperature (default: 0.7)")
+	p.add_argument("--max-tokens", dest="max_tokens", type=int, default=1024, help="Max new tokens per response (default: 1024)")
+	return p
+
+
+def main(argv: Optional[Sequence[str]] = None):
+	parser = _build_parser()
+	args = parser.parse_args(argv)
+	if args.model is not None and not args.model.is_file():
+		parser.error(f"--model: file '{args.model}' does not exist")
+	run(**vars(args))
+
+
+def run(
 	model: Optional[Path],
 	context_length: int,
 	gpu_layers: int,
@@ -66,8 +82,9 @@ def main(
 	prompt = PromptSession("You> ", history=InMemoryHistory())
 
 	def handle_command(line: str) -> bool:
-		parts = line.strip().split()
-		cmd = parts[0].lower()
+		cmd, _, rest = line.strip().partition(" ")
+		cmd = cmd.lower()
+		rest = rest.strip()
 		if cmd == ":help":
 			console.print(
 				Panel(
@@ -86,12 +103,12 @@ def main(
 		if cmd == ":exit":
 			return False
 		if cmd == ":save":
-			path = parts[1] if len(parts) > 1 else (str(save_path) if save_path else "transcript.jsonl")
+			path = rest or (str(save_path) if save_path else "transcript.jsonl")
 			p = session.save(path)
 			console.print(Panel(f"Saved to {p}", border_style="green"))
 			return True
 		if cmd == ":model":
-			new_path = parts[1] if len(parts) > 1 else None
+			new_path = rest or None
 			if not new_path:
 				console.print(Panel("Usage: :model <path>", border_style="yellow"))
 				return True
@@ -130,11 +147,24 @@ def main(
 
 		session.add_user(line)
 		console.print("Assistant> ", end="")
+		console.file.flush()
 		generated = []
+		# Write tokens straight to the terminal in small batches, bypassing Rich
+		buf = []
+		buf_len = 0
 		for piece in llm.stream_chat(session.messages, max_tokens=max_tokens, temperature=temperature):
 			generated.append(piece)
-			console.print(piece, end="", soft_wrap=True)
-		console.print()
+			buf.append(piece)
+			buf_len += len(piece)
+			if buf_len >= STREAM_FLUSH_CHARS or "\n" in piece:
+				sys.stdout.write("".join(buf))
+				sys.stdout.flush()
+				buf.clear()
+				buf_len = 0
+		if buf:
+			sys.stdout.write("".join(buf))
+		sys.stdout.write("\n")
+		sys.stdout.flush()
 		assistant_text = "".join(generated)
 		session.add_assistant(assistant_text)
 
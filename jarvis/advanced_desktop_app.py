@@ -8,20 +8,42 @@ from tkinter import ttk, filedialog, messagebox, simpledialog, scrolledtext
 import os
 import sys
 from pathlib import Path
-import threading
 import json
 import webbrowser
+import threading
+from functools import lru_cache
+from typing import Tuple
 
-from .gui import TransparentWindow
+from .gui import TransparentWindow, shared_font
 from .config import AppConfig
-from .rag_system import RAGSystem
-from .task_automation import TaskExecutor, TaskSolver
-from .enhanced_chat import EnhancedChatSession
-from .knowledge_manager import create_knowledge_base_window
-from .llama_cpp_integration import (
-    AdvancedLlamaCpp, LlamaCppInstaller, 
-    get_recommended_models, check_llama_cpp_installation
-)
+
+
+@lru_cache(maxsize=1)
+def _model_list_entries() -> Tuple[str, ...]:
+    """One listbox line per recommended model, formatted once"""
+    from .llama_cpp_integration import get_recommended_models
+    return tuple(f"{model['name']} ({model['size']}) - {model['description']}"
+                 for model in get_recommended_models())
+
+
+@lru_cache(maxsize=1)
+def _recommended_models_text() -> str:
+    """Body of the Recommended Models window, formatted once"""
+    from .llama_cpp_integration import get_recommended_models
+    parts = ["Recommended GGUF Models for Terminal Jarvis:\n\n"]
+    for i, model in enumerate(get_recommended_models(), 1):
+        parts.append(f"{i}. {model['name']}\n")
+        parts.append(f"   Repository: {model['repo']}\n")
+        parts.append(f"   Filename: {model['filename']}\n")
+        parts.append(f"   Size: {model['size']}\n")
+        parts.append(f"   Description: {model['description']}\n\n")
+    
+    parts.append("\nTo use these models:\n")
+    parts.append("1. Go to File → Load Hugging Face Model\n")
+    parts.append("2. Select a model from the list\n")
+    parts.append("3. The model will be downloaded automatically\n\n")
+    parts.append("Note: First download may take time depending on model size.")
+    return "".join(parts)
 
 
 class AdvancedDesktopApp(TransparentWindow):
@@ -29,6 +51,11 @@ class AdvancedDesktopApp(TransparentWindow):
     
     def __init__(self):
         super().__init__()
+        # Each load or close bumps the generation; a load that finishes under
+        # an older one is stale and tears down its own server
+        self._model_lock = threading.Lock()
+        self._model_generation = 0
+        self._model_loading = False
         self.setup_menu()
         self.setup_model_management()
         self.setup_rag_system()
@@ -87,6 +114,11 @@ class AdvancedDesktopApp(TransparentWindow):
     def setup_llama_cpp(self):
         """Setup llama.cpp integration"""
         try:
+            # llama.cpp support (and requests with it) is imported here, and the
+            # RAG and chat modules on first use, so opening the app doesn't
+            # load them all up front
+            from .llama_cpp_integration import check_llama_cpp_installation
+            
             # Check if llama.cpp is installed
             self.llama_cpp_status = check_llama_cpp_installation()
             
@@ -116,7 +148,7 @@ class AdvancedDesktopApp(TransparentWindow):
         
         # Title
         title_label = tk.Label(model_window, text="Select a Recommended Model", 
-                              font=('Segoe UI', 14, 'bold'), fg='white', bg='#1e1e1e')
+                              font=shared_font('Segoe UI', 14, 'bold'), fg='white', bg='#1e1e1e')
         title_label.pack(pady=10)
         
         # Models list
@@ -125,14 +157,13 @@ class AdvancedDesktopApp(TransparentWindow):
         
         # Listbox for models
         listbox = tk.Listbox(models_frame, bg='#2d2d2d', fg='white', 
-                           font=('Consolas', 10), selectbackground='#404040')
+                           font=shared_font('Consolas', 10), selectbackground='#404040')
         listbox.pack(fill=tk.BOTH, expand=True)
         
         # Add models to listbox
+        from .llama_cpp_integration import get_recommended_models
         models = get_recommended_models()
-        for i, model in enumerate(models):
-            display_text = f"{model['name']} ({model['size']}) - {model['description']}"
-            listbox.insert(tk.END, display_text)
+        listbox.insert(tk.END, *_model_list_entries())
         
         # Custom model input
         custom_frame = ttk.Frame(model_window, style='Main.TFrame')
@@ -147,13 +178,13 @@ class AdvancedDesktopApp(TransparentWindow):
         tk.Label(input_frame, text="Repo:", bg='#1e1e1e', fg='white').pack(side=tk.LEFT)
         repo_var = tk.StringVar()
         repo_entry = tk.Entry(input_frame, textvariable=repo_var, 
-                            bg='#2d2d2d', fg='white', font=('Consolas', 10))
+                            bg='#2d2d2d', fg='white', font=shared_font('Consolas', 10))
         repo_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 10))
         
         tk.Label(input_frame, text="File:", bg='#1e1e1e', fg='white').pack(side=tk.LEFT)
         file_var = tk.StringVar()
         file_entry = tk.Entry(input_frame, textvariable=file_var, 
-                            bg='#2d2d2d', fg='white', font=('Consolas', 10))
+                            bg='#2d2d2d', fg='white', font=shared_font('Consolas', 10))
         file_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
         
         def on_load():
@@ -175,33 +206,49 @@ class AdvancedDesktopApp(TransparentWindow):
         button_frame.pack(fill=tk.X, padx=10, pady=10)
         
         tk.Button(button_frame, text="Load Model", command=on_load,
-                 bg='#4CAF50', fg='white', font=('Segoe UI', 10, 'bold')).pack(side=tk.RIGHT, padx=(5, 0))
+                 bg='#4CAF50', fg='white', font=shared_font('Segoe UI', 10, 'bold')).pack(side=tk.RIGHT, padx=(5, 0))
         
         tk.Button(button_frame, text="Cancel", command=model_window.destroy,
-                 bg='#F44336', fg='white', font=('Segoe UI', 10)).pack(side=tk.RIGHT)
+                 bg='#F44336', fg='white', font=shared_font('Segoe UI', 10)).pack(side=tk.RIGHT)
     
     def load_hf_model(self, repo: str, filename: str):
         """Load Hugging Face model"""
         try:
+            # Create advanced llama.cpp instance
+            from .llama_cpp_integration import AdvancedLlamaCpp
+            llm = AdvancedLlamaCpp(hf_repo=repo, hf_filename=filename)
+            with self._model_lock:
+                # A second click can't start a download racing the first
+                if self._model_loading:
+                    self.add_message("A model is already loading, please wait", "system")
+                    return
+                self._model_loading = True
+                self._model_generation += 1
+                generation = self._model_generation
+            
             self.add_message(f"Loading model from {repo}...", "system")
             self.status_label.config(text="Loading model...")
             
-            # Create advanced llama.cpp instance
-            self.advanced_llm = AdvancedLlamaCpp(hf_repo=repo, hf_filename=filename)
-            
             # Setup model in background
             def setup_model():
+                error = None
                 try:
-                    success = self.advanced_llm.setup_model()
-                    if success:
-                        self.message_queue.put(("system", f"Model loaded successfully: {repo}"))
-                        self.message_queue.put(("status", "Ready - Model loaded"))
-                    else:
-                        self.message_queue.put(("error", "Failed to load model"))
-                        self.message_queue.put(("status", "Ready - No model loaded"))
+                    success = llm.setup_model()
                 except Exception as e:
-                    self.message_queue.put(("error", f"Error loading model: {e}"))
-                    self.message_queue.put(("status", "Ready - No model loaded"))
+                    success, error = False, str(e)
+                with self._model_lock:
+                    self._model_loading = False
+                    stale = generation != self._model_generation
+                    if success and not stale:
+                        self.advanced_llm = llm
+                if stale:
+                    llm.cleanup()
+                    return
+                # One message per outcome updates the chat and status bar together
+                if success:
+                    self.post_message("model_loaded", repo)
+                else:
+                    self.post_message("model_error", error or "llama.cpp model setup failed")
             
             threading.Thread(target=setup_model, daemon=True).start()
             
@@ -218,7 +265,7 @@ class AdvancedDesktopApp(TransparentWindow):
         
         # Title
         title_label = tk.Label(models_window, text="Recommended GGUF Models", 
-                              font=('Segoe UI', 16, 'bold'), fg='white', bg='#1e1e1e')
+                              font=shared_font('Segoe UI', 16, 'bold'), fg='white', bg='#1e1e1e')
         title_label.pack(pady=10)
         
         # Models list
@@ -228,25 +275,11 @@ class AdvancedDesktopApp(TransparentWindow):
         # Text widget for models
         text_widget = scrolledtext.ScrolledText(models_frame, 
                                               bg='#2d2d2d', fg='white',
-                                              font=('Consolas', 10), state=tk.DISABLED)
+                                              font=shared_font('Consolas', 10), state=tk.DISABLED)
         text_widget.pack(fill=tk.BOTH, expand=True)
         
         # Add models info
-        models = get_recommended_models()
-        content = "Recommended GGUF Models for Terminal Jarvis:\n\n"
-        
-        for i, model in enumerate(models, 1):
-            content += f"{i}. {model['name']}\n"
-            content += f"   Repository: {model['repo']}\n"
-            content += f"   Filename: {model['filename']}\n"
-            content += f"   Size: {model['size']}\n"
-            content += f"   Description: {model['description']}\n\n"
-        
-        content += "\nTo use these models:\n"
-        content += "1. Go to File → Load Hugging Face Model\n"
-        content += "2. Select a model from the list\n"
-        content += "3. The model will be downloaded automatically\n\n"
-        content += "Note: First download may take time depending on model size."
+        content = _recommended_models_text()
         
         text_widget.config(state=tk.NORMAL)
         text_widget.insert(tk.END, content)
@@ -262,7 +295,7 @@ class AdvancedDesktopApp(TransparentWindow):
         
         # Title
         title_label = tk.Label(install_window, text="Install llama.cpp", 
-                              font=('Segoe UI', 14, 'bold'), fg='white', bg='#1e1e1e')
+                              font=shared_font('Segoe UI', 14, 'bold'), fg='white', bg='#1e1e1e')
         title_label.pack(pady=10)
         
         # Instructions
@@ -287,7 +320,7 @@ Choose your installation method:
         
         text_widget = scrolledtext.ScrolledText(install_window, 
                                               bg='#2d2d2d', fg='white',
-                                              font=('Consolas', 10), state=tk.DISABLED)
+                                              font=shared_font('Consolas', 10), state=tk.DISABLED)
         text_widget.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         text_widget.config(state=tk.NORMAL)
         text_widget.insert(tk.END, instructions)
@@ -299,6 +332,8 @@ Choose your installation method:
         
         def try_install():
             try:
+                from .llama_cpp_integration import LlamaCppInstaller
+                
                 if sys.platform == "win32":
                     success = LlamaCppInstaller.install_windows()
                 else:
@@ -314,21 +349,24 @@ Choose your installation method:
                 messagebox.showerror("Error", f"Installation failed: {e}")
         
         tk.Button(button_frame, text="Try Auto Install", command=try_install,
-                 bg='#4CAF50', fg='white', font=('Segoe UI', 10)).pack(side=tk.LEFT, padx=(0, 5))
+                 bg='#4CAF50', fg='white', font=shared_font('Segoe UI', 10)).pack(side=tk.LEFT, padx=(0, 5))
         
         tk.Button(button_frame, text="Open GitHub", 
                  command=lambda: webbrowser.open("https://github.com/ggerganov/llama.cpp"),
-                 bg='#2196F3', fg='white', font=('Segoe UI', 10)).pack(side=tk.LEFT, padx=(0, 5))
+                 bg='#2196F3', fg='white', font=shared_font('Segoe UI', 10)).pack(side=tk.LEFT, padx=(0, 5))
         
         tk.Button(button_frame, text="Close", command=install_window.destroy,
-                 bg='#F44336', fg='white', font=('Segoe UI', 10)).pack(side=tk.RIGHT)
+                 bg='#F44336', fg='white', font=shared_font('Segoe UI', 10)).pack(side=tk.RIGHT)
     
     def check_installation(self):
         """Check llama.cpp installation status"""
-        status = check_llama_cpp_installation()
+        from .llama_cpp_integration import check_llama_cpp_installation
+        
+        status = check_llama_cpp_installation(detailed=True)
         
         status_text = "llama.cpp Installation Status:\n\n"
         status_text += f"Installed: {'Yes' if status['installed'] else 'No'}\n"
+        status_text += f"Version: {status['version'] or 'Unknown'}\n"
         status_text += f"Server Path: {status.get('server_path', 'Not found')}\n"
         status_text += f"CLI Path: {status.get('cli_path', 'Not found')}\n\n"
         
@@ -352,7 +390,7 @@ Choose your installation method:
                 bg='#2d2d2d', fg='white').pack(pady=5)
         port_var = tk.StringVar(value="8080")
         port_entry = tk.Entry(settings_window, textvariable=port_var, 
-                            bg='#1e1e1e', fg='white', font=('Consolas', 10))
+                            bg='#1e1e1e', fg='white', font=shared_font('Consolas', 10))
         port_entry.pack(pady=5)
         
         # GPU layers
@@ -360,7 +398,7 @@ Choose your installation method:
                 bg='#2d2d2d', fg='white').pack(pady=5)
         gpu_var = tk.StringVar(value="0")
         gpu_entry = tk.Entry(settings_window, textvariable=gpu_var,
-                           bg='#1e1e1e', fg='white', font=('Consolas', 10))
+                           bg='#1e1e1e', fg='white', font=shared_font('Consolas', 10))
         gpu_entry.pack(pady=5)
         
         # Context size
@@ -368,7 +406,7 @@ Choose your installation method:
                 bg='#2d2d2d', fg='white').pack(pady=5)
         ctx_var = tk.StringVar(value="4096")
         ctx_entry = tk.Entry(settings_window, textvariable=ctx_var,
-                           bg='#1e1e1e', fg='white', font=('Consolas', 10))
+                           bg='#1e1e1e', fg='white', font=shared_font('Consolas', 10))
         ctx_entry.pack(pady=5)
         
         def apply_settings():
@@ -377,7 +415,7 @@ Choose your installation method:
             settings_window.destroy()
         
         tk.Button(settings_window, text="Apply", command=apply_settings,
-                 bg='#4CAF50', fg='white', font=('Segoe UI', 10)).pack(pady=20)
+                 bg='#4CAF50', fg='white', font=shared_font('Segoe UI', 10)).pack(pady=20)
     
     def open_documentation(self):
         """Open documentation in browser"""
@@ -386,6 +424,9 @@ Choose your installation method:
     def process_llm_request(self, message: str):
         """Process LLM request with advanced llama.cpp integration"""
         try:
+            from .chat import ChatSession
+            from .enhanced_chat import EnhancedChatSession
+            
             if not self.session:
                 # Use enhanced session if RAG is available
                 if self.rag_system and self.task_solver:
@@ -400,36 +441,30 @@ Choose your installation method:
             # Use advanced llama.cpp if available
             if self.advanced_llm and self.advanced_llm.server and self.advanced_llm.server.is_running:
                 # Advanced streaming response
-                response_parts = []
-                for piece in self.advanced_llm.stream_chat(self.session.messages):
-                    response_parts.append(piece)
-                    # Update UI in main thread
-                    self.message_queue.put(("stream", piece))
+                full_response = self.post_stream(self.advanced_llm.stream_chat(self.session.messages))
                 
                 # Complete response
-                full_response = "".join(response_parts)
                 self.session.add_assistant(full_response)
-                self.message_queue.put(("complete", full_response))
+                self.post_message("complete", full_response)
             else:
                 # Fallback to standard streaming response
-                response_parts = []
-                for piece in self.llm.stream_chat(self.session.messages):
-                    response_parts.append(piece)
-                    # Update UI in main thread
-                    self.message_queue.put(("stream", piece))
+                full_response = self.post_stream(self.llm.stream_chat(self.session.messages))
                 
                 # Complete response
-                full_response = "".join(response_parts)
                 self.session.add_assistant(full_response)
-                self.message_queue.put(("complete", full_response))
+                self.post_message("complete", full_response)
             
         except Exception as e:
-            self.message_queue.put(("error", str(e)))
+            self.post_message("error", str(e))
     
     def close_app(self):
         """Close application with cleanup"""
-        if self.advanced_llm:
-            self.advanced_llm.cleanup()
+        with self._model_lock:
+            # A load still in flight sees the new generation and cleans up itself
+            self._model_generation += 1
+            llm = self.advanced_llm
+        if llm:
+            llm.cleanup()
         self.save_config()
         super().close_app()
 
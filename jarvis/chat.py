@@ -72,6 +72,9 @@ class ChatSession:
 	def __init__(self, console: Optional[Console] = None):
 		self.console = console or Console()
 		self.messages: List[Message] = []
+		# Where the transcript was last saved and the messages written there
+		self._saved_path: Optional[Path] = None
+		self._saved_messages: List[Message] = []
 
 	def add_user(self, content: str) -> None:
 		self.messages.append({"role": "user", "content": content})
@@ -84,8 +87,24 @@ class ChatSession:
 
 	def save(self, path: str) -> Path:
 		p = Path(path)
-		p.parent.mkdir(parents=True, exist_ok=True)
-		p.write_text(self.transcript_as_jsonl(), encoding="utf-8")
+		# Append only what is new since the last save to the same file; a
+		# different target, or saved messages that were removed or replaced
+		# since, gets a full rewrite
+		saved = self._saved_messages
+		if (
+			p == self._saved_path
+			and len(saved) <= len(self.messages)
+			and all(old is new for old, new in zip(saved, self.messages))
+			and p.exists()
+		):
+			with p.open("a", encoding="utf-8") as f:
+				for m in self.messages[len(saved):]:
+					f.write(json.dumps(m, ensure_ascii=False) + "\n")
+		else:
+			p.parent.mkdir(parents=True, exist_ok=True)
+			p.write_text(self.transcript_as_jsonl(), encoding="utf-8")
+		self._saved_path = p
+		self._saved_messages = list(self.messages)
 		return p
 
 	def render_system_banner(self, model_path: Optional[str]) -> None:
@@ -11,12 +11,85 @@ from pathlib import Path
 import threading
 import json
 
-from .gui import TransparentWindow
+try:
+    import orjson
+    
+    _json_loads = orjson.loads
+    
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    # Fallback to the standard library codec
+    _json_loads = json.loads
+    
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode('utf-8')
+
+from .gui import TransparentWindow, shared_font
 from .config import AppConfig
-from .rag_system import RAGSystem
-from .task_automation import TaskExecutor, TaskSolver
-from .enhanced_chat import EnhancedChatSession, EnhancedLocalLlm
-from .knowledge_manager import create_knowledge_base_window
+
+
+_JSONL_BLOCK_SIZE = 1 << 16
+
+
+def _iter_jsonl(path):
+    """Yield the records of a JSONL file, reading it in fixed-size blocks"""
+    if _json_loads is not json.loads:
+        with open(path, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    yield _json_loads(line)
+        return
+    # One decoder walks each block's complete lines instead of a loads()
+    # call per line; a partial last line is carried into the next block
+    decode = json.JSONDecoder().raw_decode
+    tail = ''
+    with open(path, 'r', encoding='utf-8') as f:
+        while True:
+            block = f.read(_JSONL_BLOCK_SIZE)
+            text = tail + block
+            if block:
+                cut = text.rfind('\n') + 1
+                text, tail = text[:cut], text[cut:]
+            idx, end = 0, len(text)
+            while True:
+                while idx < end and text[idx] in ' \t\r\n':
+                    idx += 1
+                if idx >= end:
+                    break
+                obj, idx = decode(text, idx)
+                yield obj
+            if not block:
+                return
+
+
+_SEARCH_RESULT_TEMPLATE = (
+    "Result {index}:\n"
+    "Source: {source}\n"
+    "Relevance: {relevance:.2f}\n"
+    "Text: {text}...\n"
+    + "-" * 30 + "\n\n"
+)
+
+
+def _existing_files(paths) -> set:
+    """Return the subset of paths that exist, using one scandir per parent directory"""
+    listings = {}
+    existing = set()
+    for path in paths:
+        p = Path(path)
+        # normcase folds case where the filesystem does (Windows), so this
+        # agrees with Path.exists there
+        parent = os.path.normcase(str(p.parent))
+        if parent not in listings:
+            try:
+                with os.scandir(parent) as entries:
+                    listings[parent] = {os.path.normcase(entry.name) for entry in entries}
+            except OSError:
+                listings[parent] = set()
+        if os.path.normcase(p.name) in listings[parent]:
+            existing.add(path)
+    return existing
 
 
 class DesktopApp(TransparentWindow):
@@ -69,13 +142,22 @@ class DesktopApp(TransparentWindow):
     
     def setup_model_management(self):
         """Setup model management"""
-        self.recent_models = []
+        # Insertion-ordered dict used as an LRU set: most recent model is last
+        self.recent_models = {}
+        self.current_model_path = None
         self.config_file = Path.home() / ".jarvis_desktop.json"
+        # Set whenever recent_models or current_model_path change
+        self._config_dirty = False
         self.load_recent_models()
     
     def setup_rag_system(self):
         """Setup RAG system and task automation"""
         try:
+            # Heavy dependencies (chromadb, sentence-transformers) are only
+            # imported once the RAG system is actually set up
+            from .rag_system import RAGSystem
+            from .task_automation import TaskExecutor, TaskSolver
+            
             # Initialize RAG system
             self.rag_system = RAGSystem(db_path="./jarvis_rag_db")
             
@@ -97,7 +179,7 @@ class DesktopApp(TransparentWindow):
             if self.config_file.exists():
                 with open(self.config_file, 'r') as f:
                     config = json.load(f)
-                    self.recent_models = config.get('recent_models', [])
+                    self.recent_models = self._recent_models_from_config(config)
                     
                     # Load last used model
                     last_model = config.get('last_model')
@@ -108,13 +190,15 @@ class DesktopApp(TransparentWindow):
     
     def save_config(self):
         """Save configuration to file"""
+        if not self._config_dirty:
+            return
         try:
             config = {
-                'recent_models': self.recent_models[:10],  # Keep only last 10
-                'last_model': getattr(self, 'current_model_path', None)
+                'recent_models': self.recent_models_list(),
+                'last_model': self.current_model_path
             }
-            with open(self.config_file, 'w') as f:
-                json.dump(config, f, indent=2)
+            self.config_file.write_bytes(_json_dumps(config))
+            self._config_dirty = False
         except Exception as e:
             print(f"Error saving config: {e}")
     
@@ -124,9 +208,18 @@ class DesktopApp(TransparentWindow):
             if self.config_file.exists():
                 with open(self.config_file, 'r') as f:
                     config = json.load(f)
-                    self.recent_models = config.get('recent_models', [])
+                    self.recent_models = self._recent_models_from_config(config)
         except Exception:
-            self.recent_models = []
+            self.recent_models = {}
+    
+    @staticmethod
+    def _recent_models_from_config(config: dict) -> dict:
+        """Build the recent models LRU from the most-recent-first config list"""
+        return {path: None for path in reversed(config.get('recent_models', [])[:10])}
+    
+    def recent_models_list(self) -> list:
+        """Get recent models, most recent first"""
+        return list(reversed(self.recent_models))
     
     def load_model_dialog(self):
         """Open file dialog to load a model"""
@@ -158,15 +251,17 @@ class DesktopApp(TransparentWindow):
         recent_window.attributes('-topmost', True)
         
         tk.Label(recent_window, text="Select a recent model:", 
-                bg='#2d2d2d', fg='white', font=('Segoe UI', 10)).pack(pady=10)
+                bg='#2d2d2d', fg='white', font=shared_font('Segoe UI', 10)).pack(pady=10)
         
         # Listbox for recent models
         listbox = tk.Listbox(recent_window, bg='#1e1e1e', fg='white', 
-                           font=('Consolas', 9), selectbackground='#404040')
+                           font=shared_font('Consolas', 9), selectbackground='#404040')
         listbox.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        for model_path in self.recent_models:
-            if Path(model_path).exists():
+        recent_models = self.recent_models_list()
+        existing = _existing_files(recent_models)
+        for model_path in recent_models:
+            if model_path in existing:
                 listbox.insert(tk.END, Path(model_path).name)
             else:
                 listbox.insert(tk.END, f"{Path(model_path).name} (not found)")
@@ -174,7 +269,7 @@ class DesktopApp(TransparentWindow):
         def on_select():
             selection = listbox.curselection()
             if selection:
-                model_path = self.recent_models[selection[0]]
+                model_path = recent_models[selection[0]]
                 if Path(model_path).exists():
                     self.load_model(model_path)
                     recent_window.destroy()
@@ -182,18 +277,21 @@ class DesktopApp(TransparentWindow):
                     messagebox.showerror("Error", "Model file not found.")
         
         tk.Button(recent_window, text="Load", command=on_select,
-                 bg='#4CAF50', fg='white', font=('Segoe UI', 10)).pack(pady=10)
+                 bg='#4CAF50', fg='white', font=shared_font('Segoe UI', 10)).pack(pady=10)
     
     def load_model(self, model_path: str):
         """Load a GGUF model"""
         try:
-            # Add to recent models
-            if model_path not in self.recent_models:
-                self.recent_models.insert(0, model_path)
-            else:
-                # Move to front
-                self.recent_models.remove(model_path)
-                self.recent_models.insert(0, model_path)
+            if (self.current_model_path != model_path
+                    or next(reversed(self.recent_models), None) != model_path):
+                self._config_dirty = True
+            
+            # Add to recent models, moving it to the most recent slot
+            self.recent_models.pop(model_path, None)
+            self.recent_models[model_path] = None
+            if len(self.recent_models) > 10:
+                # Keep only last 10
+                self.recent_models.pop(next(iter(self.recent_models)))
             
             self.current_model_path = model_path
             self.save_config()
@@ -232,25 +330,20 @@ class DesktopApp(TransparentWindow):
         
         if filename:
             try:
-                with open(filename, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                
-                # Clear current conversation
-                self.chat_text.config(state=tk.NORMAL)
-                self.chat_text.delete("1.0", tk.END)
-                self.chat_text.config(state=tk.DISABLED)
+                # Stream the transcript, then render it with a single insert
+                messages = []
+                for message in _iter_jsonl(filename):
+                    role = message.get('role')
+                    if role in ('user', 'assistant'):
+                        messages.append((message.get('content', ''), role))
                 
                 # Load messages
                 if self.session:
                     self.session.messages = []
                 
-                for line in lines:
-                    if line.strip():
-                        message = json.loads(line.strip())
-                        if message.get('role') == 'user':
-                            self.add_message(message.get('content', ''), 'user')
-                        elif message.get('role') == 'assistant':
-                            self.add_message(message.get('content', ''), 'assistant')
+                # Replace current conversation
+                self.clear_messages()
+                self.add_messages(messages)
                 
                 messagebox.showinfo("Success", f"Conversation loaded from {filename}")
                 
@@ -270,7 +363,7 @@ class DesktopApp(TransparentWindow):
                 bg='#2d2d2d', fg='white').pack(pady=5)
         context_var = tk.StringVar(value="4096")
         context_entry = tk.Entry(settings_window, textvariable=context_var, 
-                               bg='#1e1e1e', fg='white', font=('Consolas', 10))
+                               bg='#1e1e1e', fg='white', font=shared_font('Consolas', 10))
         context_entry.pack(pady=5)
         
         # GPU layers
@@ -278,7 +371,7 @@ class DesktopApp(TransparentWindow):
                 bg='#2d2d2d', fg='white').pack(pady=5)
         gpu_var = tk.StringVar(value="0")
         gpu_entry = tk.Entry(settings_window, textvariable=gpu_var,
-                           bg='#1e1e1e', fg='white', font=('Consolas', 10))
+                           bg='#1e1e1e', fg='white', font=shared_font('Consolas', 10))
         gpu_entry.pack(pady=5)
         
         # Temperature
@@ -286,7 +379,7 @@ class DesktopApp(TransparentWindow):
                 bg='#2d2d2d', fg='white').pack(pady=5)
         temp_var = tk.StringVar(value="0.7")
         temp_entry = tk.Entry(settings_window, textvariable=temp_var,
-                            bg='#1e1e1e', fg='white', font=('Consolas', 10))
+                            bg='#1e1e1e', fg='white', font=shared_font('Consolas', 10))
         temp_entry.pack(pady=5)
         
         def apply_settings():
@@ -298,7 +391,7 @@ class DesktopApp(TransparentWindow):
                 messagebox.showerror("Error", f"Failed to apply settings: {e}")
         
         tk.Button(settings_window, text="Apply", command=apply_settings,
-                 bg='#4CAF50', fg='white', font=('Segoe UI', 10)).pack(pady=20)
+                 bg='#4CAF50', fg='white', font=shared_font('Segoe UI', 10)).pack(pady=20)
     
     def window_settings_dialog(self):
         """Open window settings dialog"""
@@ -322,7 +415,7 @@ class DesktopApp(TransparentWindow):
             settings_window.destroy()
         
         tk.Button(settings_window, text="Apply", command=apply_window_settings,
-                 bg='#4CAF50', fg='white', font=('Segoe UI', 10)).pack(pady=20)
+                 bg='#4CAF50', fg='white', font=shared_font('Segoe UI', 10)).pack(pady=20)
     
     def show_about(self):
         """Show about dialog"""
@@ -370,6 +463,7 @@ RAG Features:
             return
         
         try:
+            from .knowledge_manager import create_knowledge_base_window
             create_knowledge_base_window(self.root, self.rag_system, self.task_solver)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to open knowledge base manager: {e}")
@@ -398,7 +492,7 @@ RAG Features:
         
         if filename:
             try:
-                result = self.rag_system.add_document(filename)
+                result = self.rag_system.add_document(filename, embed_batch_size=64)
                 if result.get("success", False):
                     messagebox.showinfo("Success", 
                                       f"Document added successfully!\n"
@@ -421,15 +515,17 @@ RAG Features:
                 results = self.rag_system.search(query, n_results=5)
                 
                 if results:
-                    result_text = f"Search Results for: '{query}'\n"
-                    result_text += "=" * 50 + "\n\n"
-                    
-                    for i, result in enumerate(results, 1):
-                        result_text += f"Result {i}:\n"
-                        result_text += f"Source: {result['metadata'].get('name', 'Unknown')}\n"
-                        result_text += f"Relevance: {1 - result['distance']:.2f}\n"
-                        result_text += f"Text: {result['text'][:200]}...\n"
-                        result_text += "-" * 30 + "\n\n"
+                    parts = [f"Search Results for: '{query}'\n" + "=" * 50 + "\n\n"]
+                    parts.extend(
+                        _SEARCH_RESULT_TEMPLATE.format(
+                            index=i,
+                            source=result['metadata'].get('name', 'Unknown'),
+                            relevance=1 - result['distance'],
+                            text=result['text'][:200],
+                        )
+                        for i, result in enumerate(results, 1)
+                    )
+                    result_text = "".join(parts)
                     
                     # Show results in a new window
                     result_window = tk.Toplevel(self.root)
@@ -439,7 +535,7 @@ RAG Features:
                     
                     text_widget = scrolledtext.ScrolledText(result_window, 
                                                           bg='#2d2d2d', fg='white',
-                                                          font=('Consolas', 9))
+                                                          font=shared_font('Consolas', 9))
                     text_widget.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
                     text_widget.insert(tk.END, result_text)
                     text_widget.config(state=tk.DISABLED)
@@ -476,6 +572,9 @@ RAG Features:
     def process_llm_request(self, message: str):
         """Process LLM request in background thread with RAG enhancement"""
         try:
+            from .chat import ChatSession
+            from .enhanced_chat import EnhancedChatSession
+            
             if not self.session:
                 # Use enhanced session if RAG is available
                 if self.rag_system and self.task_solver:
@@ -487,33 +586,20 @@ RAG Features:
             
             self.session.add_user(message)
             
-            # Use enhanced LLM if available
-            if hasattr(self, 'rag_system') and self.rag_system and hasattr(self, 'task_solver') and self.task_solver:
-                # Enhanced response with RAG
-                full_response = self.session.get_enhanced_response(self.llm, message)
-                
-                # Stream the response for UI
-                words = full_response.split()
-                for i, word in enumerate(words):
-                    piece = word + (" " if i < len(words) - 1 else "")
-                    self.message_queue.put(("stream", piece))
-                
-                self.message_queue.put(("complete", full_response))
+            # Use enhanced session if available; both paths stream real tokens
+            if isinstance(self.session, EnhancedChatSession):
+                stream = self.session.stream_enhanced_response(self.llm, message)
             else:
-                # Standard streaming response
-                response_parts = []
-                for piece in self.llm.stream_chat(self.session.messages):
-                    response_parts.append(piece)
-                    # Update UI in main thread
-                    self.message_queue.put(("stream", piece))
-                
-                # Complete response
-                full_response = "".join(response_parts)
-                self.session.add_assistant(full_response)
-                self.message_queue.put(("complete", full_response))
+                stream = self.llm.stream_chat(self.session.messages)
+            
+            full_response = self.post_stream(stream)
+            
+            # Complete response
+            self.session.add_assistant(full_response)
+            self.post_message("complete", full_response)
             
         except Exception as e:
-            self.message_queue.put(("error", str(e)))
+            self.post_message("error", str(e))
     
     def close_app(self):
         """Close application with cleanup"""
@@ -0,0 +1,100 @@
+"""
+Content-addressed embedding cache for Terminal Jarvis
+Stores chunk embeddings in SQLite keyed by a hash of the text and the model
+name, so re-adding the same text never re-runs the embedding model
+"""
+
+import atexit
+import hashlib
+import os
+import sqlite3
+import threading
+from array import array
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+try:
+    from blake3 import blake3 as _hasher
+except ImportError:
+    _hasher = hashlib.sha256
+
+DEFAULT_CACHE_PATH = Path(os.path.expanduser("~/.cache/jarvis/embeddings.db"))
+
+
+def content_hash(text: str) -> str:
+    """Hex digest identifying a piece of text"""
+    return _hasher(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """SQLite-backed map from (text hash, model name) to an embedding vector"""
+
+    def __init__(self, model_name: str, path: Optional[Path] = None, dim: Optional[int] = None):
+        self.model_name = model_name
+        self.dim = dim
+        self.path = Path(path) if path is not None else DEFAULT_CACHE_PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        # WAL keeps each put_many commit to an append instead of a journal rewrite
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "hash TEXT NOT NULL, model TEXT NOT NULL, vector BLOB NOT NULL, "
+            "PRIMARY KEY (hash, model))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS models (model TEXT PRIMARY KEY, dim INTEGER NOT NULL)"
+        )
+        if dim is not None:
+            self._check_dim(dim)
+        self._conn.commit()
+        # Checkpoint the WAL into the database file on exit
+        atexit.register(self.close)
+
+    def _check_dim(self, dim: int) -> None:
+        """Drop this model's vectors if they were stored with another dimension"""
+        row = self._conn.execute("SELECT dim FROM models WHERE model = ?", (self.model_name,)).fetchone()
+        if row is not None and row[0] != dim:
+            self._conn.execute("DELETE FROM embeddings WHERE model = ?", (self.model_name,))
+        self._conn.execute("INSERT OR REPLACE INTO models VALUES (?, ?)", (self.model_name, dim))
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Look up embeddings for texts, None where the cache has no entry"""
+        hashes = [content_hash(text) for text in texts]
+        found = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(hashes), 500):
+                batch = hashes[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE model = ? "
+                    f"AND hash IN ({','.join('?' * len(batch))})",
+                    [self.model_name, *batch],
+                )
+                for key, blob in rows:
+                    found[key] = blob
+        vectors = []
+        for key in hashes:
+            blob = found.get(key)
+            if blob is None:
+                vectors.append(None)
+            else:
+                vector = array("f")
+                vector.frombytes(blob)
+                vectors.append(vector.tolist())
+        return vectors
+
+    def put_many(self, texts: Sequence[str], embeddings: Sequence[Sequence[float]]) -> None:
+        """Store embeddings for texts"""
+        rows = [(content_hash(text), self.model_name, array("f", embedding).tobytes())
+                for text, embedding in zip(texts, embeddings)]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)", rows)
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
@@ -6,7 +6,7 @@ Combines knowledge retrieval with automated task execution
 import json
 import os
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator
 import logging
 from datetime import datetime
 
@@ -16,6 +16,31 @@ from .chat import LocalLlm, ChatSession
 
 logger = logging.getLogger(__name__)
 
+# Static system prompt. It must stay byte-identical across turns so llama.cpp
+# can reuse the KV cache for the shared prompt prefix instead of re-prefilling it.
+SYSTEM_PROMPT = "\n".join([
+    "You are Terminal Jarvis, an AI assistant with access to a knowledge base and task automation capabilities.",
+    "You can help with programming, system administration, and general questions.",
+    "",
+    "**Instructions:**",
+    "- Provide helpful, accurate information",
+    "- If you can perform a task automatically, mention it",
+    "- Use the knowledge base information to enhance your response",
+    "- Be concise but thorough",
+])
+
+# Tokens reserved for the reply
+RESPONSE_MAX_TOKENS = 1024
+# Conservative characters-per-token estimate and per-message template cost,
+# used to keep the prompt inside the model's context window
+CHARS_PER_TOKEN = 3
+MESSAGE_OVERHEAD_TOKENS = 8
+
+
+def _estimate_tokens(message: Dict[str, str]) -> int:
+    """Upper-bound guess at how many tokens a chat message takes"""
+    return len(message["content"]) // CHARS_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS
+
 
 class EnhancedChatSession(ChatSession):
     """Enhanced chat session with RAG and task automation capabilities"""
@@ -56,35 +81,42 @@ class EnhancedChatSession(ChatSession):
     
     def get_enhanced_response(self, llm: LocalLlm, user_message: str) -> str:
         """Get enhanced response using RAG and task automation"""
+        return "".join(self.stream_enhanced_response(llm, user_message))
+    
+    def stream_enhanced_response(self, llm: LocalLlm, user_message: str) -> Iterator[str]:
+        """Stream enhanced response tokens using RAG and task automation"""
         try:
             # Check if this is a task request
             if self._is_task_request(user_message):
-                return self._handle_task_request(user_message)
+                yield self._handle_task_request(user_message)
+                return
             
             # Get relevant context from knowledge base
             context = ""
             if self.knowledge_base_enabled:
                 context = self.rag_system.get_context_for_query(user_message, max_chunks=3)
             
-            # Prepare enhanced prompt
-            enhanced_prompt = self._create_enhanced_prompt(user_message, context)
+            # Prepare enhanced prompt, leaving room in the context for the reply
+            context_length = getattr(llm, "context_length", 4096)
+            enhanced_messages = self._create_enhanced_messages(
+                user_message, context, context_length - RESPONSE_MAX_TOKENS
+            )
             
-            # Get response from LLM
+            # Pass tokens through as the LLM generates them
             response_parts = []
-            for piece in llm.stream_chat([{"role": "user", "content": enhanced_prompt}], 
-                                       max_tokens=1024, temperature=0.7):
+            for piece in llm.stream_chat(enhanced_messages, max_tokens=RESPONSE_MAX_TOKENS, temperature=0.7):
                 response_parts.append(piece)
+                yield piece
             
+            # Post-process response, emitting only what was appended
             response = "".join(response_parts)
-            
-            # Post-process response
-            response = self._post_process_response(response, user_message)
-            
-            return response
+            processed = self._post_process_response(response, user_message)
+            if len(processed) > len(response):
+                yield processed[len(response):]
             
         except Exception as e:
             logger.error(f"Error getting enhanced response: {e}")
-            return f"I encountered an error while processing your request: {e}"
+            yield f"I encountered an error while processing your request: {e}"
     
     def _is_task_request(self, message: str) -> bool:
         """Check if the message is requesting a task to be performed"""
@@ -145,33 +177,54 @@ class EnhancedChatSession(ChatSession):
             logger.error(f"Error handling task request: {e}")
             return f"❌ **Error processing task:** {e}"
     
-    def _create_enhanced_prompt(self, user_message: str, context: str) -> str:
-        """Create enhanced prompt with context and instructions"""
-        prompt_parts = []
+    def _create_enhanced_messages(self, user_message: str, context: str,
+                                  token_budget: int = 4096 - RESPONSE_MAX_TOKENS) -> List[Dict[str, str]]:
+        """Create prompt messages with a stable prefix and per-turn context at the
+        tail, dropping the oldest turns so the prompt fits token_budget"""
+        # Prefix: the one static system prompt followed by the conversation so
+        # far. Retrieved context changes every turn, so it goes into the
+        # current user turn to keep the prefix cacheable (and because several
+        # chat templates reject a second system message).
+        history = self.messages
+        if history and history[-1] == {"role": "user", "content": user_message}:
+            history = history[:-1]
         
-        # System instructions
-        prompt_parts.append("You are Terminal Jarvis, an AI assistant with access to a knowledge base and task automation capabilities.")
-        prompt_parts.append("You can help with programming, system administration, and general questions.")
+        context_parts = []
         
         # Add context if available
         if context:
-            prompt_parts.append(f"\n**Relevant Information from Knowledge Base:**\n{context}")
+            context_parts.append(f"**Relevant Information from Knowledge Base:**\n{context}")
         
         # Add conversation context
         if self.conversation_context["current_topic"]:
-            prompt_parts.append(f"\n**Current Topic:** {self.conversation_context['current_topic']}")
+            context_parts.append(f"**Current Topic:** {self.conversation_context['current_topic']}")
+        
+        system = {"role": "system", "content": SYSTEM_PROMPT}
+        budget = token_budget - _estimate_tokens(system)
         
-        # Add user message
-        prompt_parts.append(f"\n**User Question:** {user_message}")
+        # The user's own words always go in; context is cut short if needed
+        question = {"role": "user", "content": user_message}
+        budget -= _estimate_tokens(question)
+        if context_parts:
+            context_text = "\n\n".join(context_parts)
+            context_text = context_text[:max(0, budget - MESSAGE_OVERHEAD_TOKENS) * CHARS_PER_TOKEN]
+            if context_text:
+                question["content"] = f"{context_text}\n\n**Question:** {user_message}"
+                budget -= len(context_text) // CHARS_PER_TOKEN
         
-        # Instructions for response
-        prompt_parts.append("\n**Instructions:**")
-        prompt_parts.append("- Provide helpful, accurate information")
-        prompt_parts.append("- If you can perform a task automatically, mention it")
-        prompt_parts.append("- Use the knowledge base information to enhance your response")
-        prompt_parts.append("- Be concise but thorough")
+        # Newest turns first until the budget runs out
+        start = len(history)
+        while start > 0:
+            cost = _estimate_tokens(history[start - 1])
+            if cost > budget:
+                break
+            budget -= cost
+            start -= 1
+        # Templates expect the history to open with a user turn
+        while start < len(history) and history[start]["role"] != "user":
+            start += 1
         
-        return "\n".join(prompt_parts)
+        return [system, *history[start:], question]
     
     def _post_process_response(self, response: str, user_message: str) -> str:
         """Post-process the LLM response"""
@@ -3,27 +3,77 @@ Desktop GUI for Terminal Jarvis - Transparent, pip mode, minimizable
 """
 
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
+from tkinter import ttk, scrolledtext, font as tkfont
+import sys
 import threading
 import queue
 import time
+from collections import deque
+from functools import lru_cache
 from typing import Optional, Callable
-import json
 from pathlib import Path
 
-try:
-    from jarvis.chat import LocalLlm, ChatSession
-    from jarvis.config import AppConfig
-except ImportError:
-    # Fallback for when running as standalone
-    LocalLlm = None
-    ChatSession = None
-    AppConfig = None
+
+def _ensure_llm():
+    """Import the model and chat classes on first use"""
+    # jarvis.chat pulls in rich and llama-cpp, so the window can come up
+    # before they are loaded
+    try:
+        from jarvis.chat import ChatSession
+        from jarvis.llm_process import LlmProcess
+    except ImportError as e:
+        raise ImportError(f"llama-cpp-python not available: {e}") from e
+    return LlmProcess, ChatSession
+
+
+@lru_cache(maxsize=None)
+def shared_font(family: str, size: int, *styles: str) -> tkfont.Font:
+    """Get a named font shared by every widget using the same description"""
+    # Stable names such as JarvisSegoeUI10Bold let styles, tags and the option
+    # database refer to the same font object by string
+    name = "Jarvis" + "".join(word[:1].upper() + word[1:]
+                              for word in " ".join((family, str(size), *styles)).split())
+    return tkfont.Font(
+        name=name,
+        family=family,
+        size=size,
+        weight='bold' if 'bold' in styles else 'normal',
+        slant='italic' if 'italic' in styles else 'roman',
+    )
 
 
 class TransparentWindow:
     """A transparent, always-on-top window with modern styling"""
     
+    # Messages and lines kept in the chat widget; older ones move to the scrollback
+    # and are paged back in when the user scrolls to the top
+    MAX_VISIBLE_MESSAGES = 500
+    MAX_VISIBLE_LINES = 5000
+    SCROLLBACK_PAGE_SIZE = 50
+    # Streamed pieces are posted to the UI in batches of this many pieces
+    # or after this many seconds, whichever comes first
+    STREAM_BATCH_PIECES = 16
+    STREAM_BATCH_INTERVAL = 0.033
+    # Safety net for queued messages whose wake-up event was lost
+    DRAIN_WATCHDOG_MS = 500
+    # Auto-scroll rate limit while streaming
+    SEE_END_INTERVAL_MS = 33
+    CHAT_NAVIGATION_KEYS = frozenset((
+        'Up', 'Down', 'Left', 'Right', 'Prior', 'Next', 'Home', 'End',
+        'Shift_L', 'Shift_R', 'Control_L', 'Control_R',
+    ))
+    
+    MESSAGE_PREFIXES = {
+        "user": "You: ",
+        "assistant": "Jarvis: ",
+        "system": "System: ",
+        "error": "Error: ",
+    }
+    # Insert arguments for each role's tagged prefix, built once
+    _ROLE_RUNS = {role: (prefix, role) for role, prefix in MESSAGE_PREFIXES.items()}
+    # Offset from an assistant message's mark to the start of its text
+    _ASSISTANT_BODY = f" + {len(MESSAGE_PREFIXES['assistant'])}c"
+    
     def __init__(self):
         self.root = tk.Tk()
         self.setup_window()
@@ -36,10 +86,19 @@ class TransparentWindow:
         self.is_pip_mode = True
         self.llm = None
         self.session = None
-        self.message_queue = queue.Queue()
-        
-        # Start message processing
-        self.process_messages()
+        # Messages from background threads; the UI swaps the whole list out
+        # under the lock, so there is one lock round-trip per drained batch
+        self._pending_messages = []
+        self._pending_lock = threading.Lock()
+        # Background threads wake the UI with a virtual event instead of polling
+        self._drain_scheduled = False
+        self.root.bind("<<DrainQueue>>", lambda event: self._drain_queue())
+        self.root.after(self.DRAIN_WATCHDOG_MS, self._drain_watchdog)
+        
+        # One long-lived worker serves every LLM request
+        self._request_queue = queue.Queue()
+        self._request_worker = threading.Thread(target=self._llm_worker, daemon=True)
+        self._request_worker.start()
     
     def setup_window(self):
         """Configure the main window properties"""
@@ -97,6 +156,35 @@ class TransparentWindow:
                  background=[('active', '#505050'),
                            ('pressed', '#606060')])
         
+        # Title bar and send buttons inherit from Control.TButton
+        style.configure('Minimize.Control.TButton',
+                       font=shared_font('Segoe UI', 12, 'bold'),
+                       width=3,
+                       padding=(2, 0))
+        style.configure('Pip.Control.TButton',
+                       font=shared_font('Segoe UI', 10),
+                       width=3,
+                       padding=(2, 0))
+        style.configure('PipActive.Pip.Control.TButton',
+                       background='#4CAF50')
+        style.configure('Close.Control.TButton',
+                       background='#e74c3c',
+                       font=shared_font('Segoe UI', 12, 'bold'),
+                       width=3,
+                       padding=(2, 0))
+        style.map('Close.Control.TButton',
+                 background=[('active', '#ec7063'),
+                           ('pressed', '#c0392b')])
+        style.configure('Send.Control.TButton',
+                       background='#4CAF50',
+                       font=shared_font('Segoe UI', 10, 'bold'),
+                       width=8,
+                       padding=(4, 10))
+        style.map('Send.Control.TButton',
+                 background=[('disabled', '#2e6b31'),
+                           ('active', '#5cb860'),
+                           ('pressed', '#3d8b40')])
+        
         # Text area style
         style.configure('Chat.TFrame',
                        background='#1e1e1e',
@@ -130,7 +218,7 @@ class TransparentWindow:
                               text="Terminal Jarvis",
                               fg='white',
                               bg='#2d2d2d',
-                              font=('Segoe UI', 10, 'bold'))
+                              font=shared_font('Segoe UI', 10, 'bold'))
         title_label.pack(side=tk.LEFT, padx=10, pady=5)
         
         # Control buttons
@@ -138,39 +226,24 @@ class TransparentWindow:
         button_frame.pack(side=tk.RIGHT, padx=5, pady=2)
         
         # Minimize button
-        self.minimize_btn = tk.Button(button_frame,
-                                    text="−",
-                                    command=self.toggle_minimize,
-                                    bg='#404040',
-                                    fg='white',
-                                    font=('Segoe UI', 12, 'bold'),
-                                    borderwidth=0,
-                                    width=3,
-                                    height=1)
+        self.minimize_btn = ttk.Button(button_frame,
+                                     text="−",
+                                     command=self.toggle_minimize,
+                                     style='Minimize.Control.TButton')
         self.minimize_btn.pack(side=tk.LEFT, padx=2)
         
         # Pip mode toggle
-        self.pip_btn = tk.Button(button_frame,
-                               text="📌",
-                               command=self.toggle_pip_mode,
-                               bg='#404040',
-                               fg='white',
-                               font=('Segoe UI', 10),
-                               borderwidth=0,
-                               width=3,
-                               height=1)
+        self.pip_btn = ttk.Button(button_frame,
+                                text="📌",
+                                command=self.toggle_pip_mode,
+                                style='Pip.Control.TButton')
         self.pip_btn.pack(side=tk.LEFT, padx=2)
         
         # Close button
-        self.close_btn = tk.Button(button_frame,
-                                 text="×",
-                                 command=self.close_app,
-                                 bg='#e74c3c',
-                                 fg='white',
-                                 font=('Segoe UI', 12, 'bold'),
-                                 borderwidth=0,
-                                 width=3,
-                                 height=1)
+        self.close_btn = ttk.Button(button_frame,
+                                  text="×",
+                                  command=self.close_app,
+                                  style='Close.Control.TButton')
         self.close_btn.pack(side=tk.LEFT, padx=2)
     
     def create_chat_area(self):
@@ -184,7 +257,7 @@ class TransparentWindow:
             wrap=tk.WORD,
             bg='#1e1e1e',
             fg='white',
-            font=('Consolas', 10),
+            font=shared_font('Consolas', 10),
             borderwidth=0,
             state=tk.DISABLED,
             padx=10,
@@ -193,10 +266,22 @@ class TransparentWindow:
         self.chat_text.pack(fill=tk.BOTH, expand=True)
         
         # Configure text tags for styling
-        self.chat_text.tag_configure("user", foreground="#4CAF50", font=('Consolas', 10, 'bold'))
-        self.chat_text.tag_configure("assistant", foreground="#2196F3", font=('Consolas', 10))
-        self.chat_text.tag_configure("system", foreground="#FF9800", font=('Consolas', 9, 'italic'))
-        self.chat_text.tag_configure("error", foreground="#F44336", font=('Consolas', 9))
+        self.chat_text.tag_configure("user", foreground="#4CAF50", font=shared_font('Consolas', 10, 'bold'))
+        self.chat_text.tag_configure("assistant", foreground="#2196F3", font=shared_font('Consolas', 10))
+        self.chat_text.tag_configure("system", foreground="#FF9800", font=shared_font('Consolas', 9, 'italic'))
+        self.chat_text.tag_configure("error", foreground="#F44336", font=shared_font('Consolas', 9))
+        
+        # Visible messages as [start_mark, msg_type, message] plus trimmed history
+        self._visible_messages = deque()
+        self._scrollback = deque(maxlen=100000)
+        self._mark_seq = 0
+        # Entry of the assistant message currently being streamed, if any
+        self._stream_entry = None
+        self._see_pending = False
+        self.chat_text.bind('<Key>', self._on_chat_key)
+        for event in ('<<Paste>>', '<<PasteSelection>>', '<<Cut>>', '<<Clear>>'):
+            self.chat_text.bind(event, lambda e: "break" if self._stream_entry is not None else None)
+        self.chat_text.configure(yscrollcommand=self._on_chat_scroll)
     
     def create_input_area(self):
         """Create the input area"""
@@ -208,7 +293,7 @@ class TransparentWindow:
                                 height=3,
                                 bg='#2d2d2d',
                                 fg='white',
-                                font=('Consolas', 10),
+                                font=shared_font('Consolas', 10),
                                 borderwidth=1,
                                 relief=tk.SOLID,
                                 wrap=tk.WORD,
@@ -217,20 +302,17 @@ class TransparentWindow:
         self.input_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
         
         # Send button
-        self.send_btn = tk.Button(input_frame,
-                                text="Send",
-                                command=self.send_message,
-                                bg='#4CAF50',
-                                fg='white',
-                                font=('Segoe UI', 10, 'bold'),
-                                borderwidth=0,
-                                width=8,
-                                height=2)
+        self.send_btn = ttk.Button(input_frame,
+                                 text="Send",
+                                 command=self.send_message,
+                                 style='Send.Control.TButton')
         self.send_btn.pack(side=tk.RIGHT, pady=2)
         
         # Bind Enter key to send
         self.input_text.bind('<Control-Return>', lambda e: self.send_message())
-        self.input_text.bind('<KeyPress>', self.on_input_key)
+        # Resize only when the content changes, not on every keypress
+        self._input_lines = 0
+        self.input_text.bind('<<Modified>>', self.on_input_modified)
     
     def create_status_bar(self):
         """Create the status bar"""
@@ -242,7 +324,7 @@ class TransparentWindow:
                                    text="Ready - No model loaded",
                                    fg='#888888',
                                    bg='#1e1e1e',
-                                   font=('Segoe UI', 8),
+                                   font=shared_font('Segoe UI', 8),
                                    anchor=tk.W)
         self.status_label.pack(side=tk.LEFT, padx=5, pady=2)
         
@@ -251,13 +333,14 @@ class TransparentWindow:
                                   text="",
                                   fg='#888888',
                                   bg='#1e1e1e',
-                                  font=('Segoe UI', 8),
+                                  font=shared_font('Segoe UI', 8),
                                   anchor=tk.E)
         self.model_label.pack(side=tk.RIGHT, padx=5, pady=2)
     
     def setup_bindings(self):
         """Set up window bindings"""
         # Make window draggable
+        self._drag_target = None
         self.main_frame.bind('<Button-1>', self.start_drag)
         self.main_frame.bind('<B1-Motion>', self.drag_window)
         
@@ -267,14 +350,36 @@ class TransparentWindow:
     
     def start_drag(self, event):
         """Start dragging the window"""
+        if sys.platform == 'win32':
+            # Hand the move to the window manager as if the title bar were
+            # grabbed; Windows runs its own move loop until the button is released
+            import ctypes
+            user32 = ctypes.windll.user32
+            hwnd = user32.GetParent(self.root.winfo_id())
+            user32.ReleaseCapture()
+            user32.SendMessageW(hwnd, 0xA1, 2, 0)  # WM_NCLBUTTONDOWN, HTCAPTION
+            return "break"
+        
         self.drag_start_x = event.x
         self.drag_start_y = event.y
+        self._drag_target = None
     
     def drag_window(self, event):
         """Drag the window"""
         x = self.root.winfo_x() + (event.x - self.drag_start_x)
         y = self.root.winfo_y() + (event.y - self.drag_start_y)
-        self.root.geometry(f"+{x}+{y}")
+        # Motion events arrive faster than the window can move; apply only
+        # the latest position once the event queue is idle
+        if self._drag_target is None:
+            self.root.after_idle(self._apply_drag)
+        self._drag_target = (x, y)
+    
+    def _apply_drag(self):
+        """Move the window to the most recent drag position"""
+        if self._drag_target is not None:
+            x, y = self._drag_target
+            self._drag_target = None
+            self.root.geometry(f"+{x}+{y}")
     
     def on_focus_in(self, event):
         """Handle focus in"""
@@ -302,48 +407,155 @@ class TransparentWindow:
         self.root.attributes('-topmost', self.is_pip_mode)
         
         if self.is_pip_mode:
-            self.pip_btn.config(text="📌", bg='#4CAF50')
+            self.pip_btn.config(style='PipActive.Pip.Control.TButton')
         else:
-            self.pip_btn.config(text="📌", bg='#404040')
+            self.pip_btn.config(style='Pip.Control.TButton')
     
     def close_app(self):
         """Close the application"""
+        self._request_queue.put(None)
+        if self.llm is not None and hasattr(self.llm, 'close'):
+            self.llm.close()
         self.root.quit()
         self.root.destroy()
     
-    def on_input_key(self, event):
-        """Handle input key events"""
-        # Auto-resize input area
-        self.root.after(10, self.auto_resize_input)
+    def on_input_modified(self, event):
+        """Handle input content changes"""
+        # Re-arm <<Modified>>, which only fires when the flag goes from 0 to 1
+        self.input_text.edit_modified(False)
+        self.auto_resize_input()
     
     def auto_resize_input(self):
         """Auto-resize input text area"""
-        self.input_text.update_idletasks()
         lines = int(self.input_text.index('end-1c').split('.')[0])
-        if lines <= 3:
-            self.input_text.config(height=3)
-        elif lines <= 6:
-            self.input_text.config(height=lines)
-        else:
-            self.input_text.config(height=6)
+        if lines == self._input_lines:
+            return
+        self._input_lines = lines
+        self.input_text.config(height=min(max(lines, 3), 6))
+    
+    def _message_runs(self, message: str, msg_type: str) -> tuple:
+        """Build the (text, tags, ...) insert arguments for a message"""
+        return self._ROLE_RUNS.get(msg_type, ()) + (message + "\n\n", ())
+    
+    @staticmethod
+    def _line_count(runs: tuple) -> int:
+        """Count the text lines produced by a message's insert arguments"""
+        return sum(text.count("\n") for text in runs[::2])
+    
+    def _new_message_mark(self, index: str) -> str:
+        """Create a left-gravity mark at the start of a message"""
+        self._mark_seq += 1
+        mark = f"msg{self._mark_seq}"
+        self.chat_text.mark_set(mark, index)
+        self.chat_text.mark_gravity(mark, tk.LEFT)
+        return mark
     
     def add_message(self, message: str, msg_type: str = "assistant"):
         """Add a message to the chat area"""
         self.chat_text.config(state=tk.NORMAL)
         
-        if msg_type == "user":
-            self.chat_text.insert(tk.END, "You: ", "user")
-        elif msg_type == "assistant":
-            self.chat_text.insert(tk.END, "Jarvis: ", "assistant")
-        elif msg_type == "system":
-            self.chat_text.insert(tk.END, "System: ", "system")
-        elif msg_type == "error":
-            self.chat_text.insert(tk.END, "Error: ", "error")
+        mark = self._new_message_mark("end-1c")
+        self._visible_messages.append([mark, msg_type, message])
+        self.chat_text.insert(tk.END, *self._message_runs(message, msg_type))
+        self._trim_chat()
         
-        self.chat_text.insert(tk.END, message + "\n\n")
-        self.chat_text.config(state=tk.DISABLED)
+        self._lock_chat()
+        self.chat_text.see(tk.END)
+    
+    def add_messages(self, messages):
+        """Add many (message, msg_type) pairs to the chat area with one insert"""
+        messages = list(messages)
+        older = messages[:-self.MAX_VISIBLE_MESSAGES]
+        messages = messages[-self.MAX_VISIBLE_MESSAGES:]
+        self._scrollback.extend((msg_type, message) for message, msg_type in older)
+        if not messages:
+            return
+        
+        self.chat_text.config(state=tk.NORMAL)
+        
+        line = int(self.chat_text.index("end-1c").split('.')[0])
+        rendered = [self._message_runs(message, msg_type) for message, msg_type in messages]
+        runs = []
+        for message_runs in rendered:
+            runs.extend(message_runs)
+        self.chat_text.insert(tk.END, *runs)
+        
+        # Every message ends with a newline, so each one starts at column 0 of
+        # a known line; mark positions are computed from line counts
+        for (message, msg_type), message_runs in zip(messages, rendered):
+            mark = self._new_message_mark(f"{line}.0")
+            self._visible_messages.append([mark, msg_type, message])
+            line += self._line_count(message_runs)
+        self._trim_chat()
+        
+        self._lock_chat()
         self.chat_text.see(tk.END)
     
+    def clear_messages(self):
+        """Remove all messages from the chat area and scrollback"""
+        if self._stream_entry is not None:
+            self.chat_text.mark_unset("stream_end")
+            self._stream_entry = None
+        self.chat_text.config(state=tk.NORMAL)
+        self.chat_text.delete("1.0", tk.END)
+        self.chat_text.config(state=tk.DISABLED)
+        for mark, _, _ in self._visible_messages:
+            self.chat_text.mark_unset(mark)
+        self._visible_messages.clear()
+        self._scrollback.clear()
+    
+    def _trim_chat(self):
+        """Move the oldest messages to the scrollback once over the visible caps"""
+        visible = self._visible_messages
+        while len(visible) > 1 and visible[0] is not self._stream_entry and (
+                len(visible) > self.MAX_VISIBLE_MESSAGES
+                or int(self.chat_text.index("end-1c").split('.')[0]) > self.MAX_VISIBLE_LINES):
+            mark, msg_type, message = self._visible_messages.popleft()
+            self.chat_text.delete("1.0", self._visible_messages[0][0])
+            self.chat_text.mark_unset(mark)
+            self._scrollback.append((msg_type, message))
+    
+    def _on_chat_scroll(self, first, last):
+        """Update the scrollbar and page in older messages at the top"""
+        self.chat_text.vbar.set(first, last)
+        if float(first) <= 0.0 and self._scrollback:
+            self.root.after_idle(self._load_older_messages)
+    
+    def _load_older_messages(self):
+        """Prepend a page of messages from the scrollback"""
+        if not self._scrollback or not self._visible_messages:
+            return
+        if float(self.chat_text.yview()[0]) > 0.0:
+            return
+        
+        count = min(self.SCROLLBACK_PAGE_SIZE, len(self._scrollback))
+        older = [self._scrollback.pop() for _ in range(count)]
+        older.reverse()
+        
+        rendered = [self._message_runs(message, msg_type) for msg_type, message in older]
+        runs = []
+        for message_runs in rendered:
+            runs.extend(message_runs)
+        
+        self.chat_text.config(state=tk.NORMAL)
+        self.chat_text.insert("1.0", *runs)
+        self._lock_chat()
+        
+        # Every message ends with a newline, so each one starts at column 0 of
+        # a known line; place marks for the new messages and move the previous
+        # first message after them
+        line = 1
+        entries = []
+        for (msg_type, message), message_runs in zip(older, rendered):
+            entries.append([self._new_message_mark(f"{line}.0"), msg_type, message])
+            line += self._line_count(message_runs)
+        anchor = self._visible_messages[0][0]
+        self.chat_text.mark_set(anchor, f"{line}.0")
+        self._visible_messages.extendleft(reversed(entries))
+        
+        # Keep the message the user was looking at in place
+        self.chat_text.yview(anchor)
+    
     def send_message(self):
         """Send a message to the LLM"""
         message = self.input_text.get("1.0", tk.END).strip()
@@ -362,111 +574,234 @@ class TransparentWindow:
         
         # Send to LLM in background thread
         if self.llm and self.session:
-            threading.Thread(target=self.process_llm_request, args=(message,), daemon=True).start()
+            self._request_queue.put(message)
         else:
             self.add_message("No model loaded. Please load a model first.", "error")
             self.status_label.config(text="Ready - No model loaded")
             self.send_btn.config(state=tk.NORMAL)
     
+    def _llm_worker(self):
+        """Run queued LLM requests one at a time"""
+        while True:
+            message = self._request_queue.get()
+            if message is None:
+                break
+            self.process_llm_request(message)
+    
     def process_llm_request(self, message: str):
         """Process LLM request in background thread"""
         try:
             if not self.session:
+                _, ChatSession = _ensure_llm()
                 self.session = ChatSession()
             
             self.session.add_user(message)
             
             # Stream response
-            response_parts = []
-            for piece in self.llm.stream_chat(self.session.messages):
-                response_parts.append(piece)
-                # Update UI in main thread
-                self.message_queue.put(("stream", piece))
+            full_response = self.post_stream(self.llm.stream_chat(self.session.messages))
             
             # Complete response
-            full_response = "".join(response_parts)
             self.session.add_assistant(full_response)
-            self.message_queue.put(("complete", full_response))
+            self.post_message("complete", full_response)
             
         except Exception as e:
-            self.message_queue.put(("error", str(e)))
+            self.post_message("error", str(e))
     
-    def process_messages(self):
-        """Process messages from background threads"""
-        try:
-            while True:
-                msg_type, content = self.message_queue.get_nowait()
-                
-                if msg_type == "stream":
-                    # Update streaming response
-                    if not hasattr(self, 'current_response'):
-                        self.current_response = ""
-                        self.add_message("", "assistant")
-                        self.response_start = self.chat_text.index("end-2c")
-                    
-                    self.current_response += content
-                    self.update_streaming_response()
-                
-                elif msg_type == "complete":
-                    # Complete the response
-                    if hasattr(self, 'current_response'):
-                        delattr(self, 'current_response')
-                    self.status_label.config(text="Ready")
-                    self.send_btn.config(state=tk.NORMAL)
-                
-                elif msg_type == "error":
-                    self.add_message(content, "error")
-                    self.status_label.config(text="Error occurred")
-                    self.send_btn.config(state=tk.NORMAL)
-                    
-        except queue.Empty:
-            pass
-        
-        # Schedule next check
-        self.root.after(100, self.process_messages)
-    
-    def update_streaming_response(self):
-        """Update the streaming response in the chat"""
-        if not hasattr(self, 'current_response'):
+    def post_stream(self, stream) -> str:
+        """Post streamed pieces to the UI in small batches and return the full text"""
+        # The batches posted to the UI double as the parts of the final text,
+        # so each piece is buffered exactly once
+        batches = []
+        pending = []
+        # Hoist lookups out of the per-token loop
+        post = self.post_message
+        monotonic = time.monotonic
+        batch_pieces = self.STREAM_BATCH_PIECES
+        batch_interval = self.STREAM_BATCH_INTERVAL
+        last_flush = monotonic()
+        for piece in stream:
+            pending.append(piece)
+            now = monotonic()
+            if (len(pending) >= batch_pieces or '\n' in piece
+                    or now - last_flush > batch_interval):
+                batch = "".join(pending)
+                batches.append(batch)
+                post("stream", batch)
+                pending.clear()
+                last_flush = now
+        if pending:
+            batch = "".join(pending)
+            batches.append(batch)
+            post("stream", batch)
+        return "".join(batches)
+    
+    def post_message(self, msg_type: str, content):
+        """Queue a message from a background thread and schedule a UI drain"""
+        with self._pending_lock:
+            pending = self._pending_messages
+            if msg_type == "stream":
+                # Stream text queued right behind stream text joins that entry,
+                # so the drain applies each run of it with one widget update
+                if pending and pending[-1][0] == "stream":
+                    pending[-1][1].append(content)
+                else:
+                    pending.append((msg_type, [content]))
+            else:
+                pending.append((msg_type, content))
+            # One wake-up covers everything queued until the drain starts
+            wake = not self._drain_scheduled
+            self._drain_scheduled = True
+        if wake:
+            try:
+                self.root.event_generate("<<DrainQueue>>", when="tail")
+            except (RuntimeError, tk.TclError):
+                # Main loop not running yet; the watchdog picks it up
+                self._drain_scheduled = False
+    
+    def _drain_watchdog(self):
+        """Drain anything a missed wake-up left in the queue"""
+        if self._pending_messages:
+            self._drain_queue()
+        self.root.after(self.DRAIN_WATCHDOG_MS, self._drain_watchdog)
+    
+    def _drain_queue(self):
+        """Process all pending messages from background threads in one pass"""
+        with self._pending_lock:
+            batch, self._pending_messages = self._pending_messages, []
+            self._drain_scheduled = False
+        
+        for msg_type, content in batch:
+            if msg_type == "stream":
+                # Every piece of stream text queued in a row, see post_message
+                self._apply_stream("".join(content))
+            
+            elif msg_type == "complete":
+                # Complete the response
+                self._finish_stream(content)
+                self.status_label.config(text="Ready")
+                self.send_btn.config(state=tk.NORMAL)
+            
+            elif msg_type == "error":
+                self._finish_stream()
+                self.add_message(content, "error")
+                self.status_label.config(text="Error occurred")
+                self.send_btn.config(state=tk.NORMAL)
+            
+            elif msg_type == "model_loaded":
+                # Background model load finished; allow sending again
+                self.add_message(f"Model loaded successfully: {content}", "system")
+                self.status_label.config(text="Ready - Model loaded")
+                self.model_label.config(text=content)
+                self.send_btn.config(state=tk.NORMAL)
+            
+            elif msg_type == "model_error":
+                self.add_message(f"Failed to load model: {content}", "error")
+                self.status_label.config(text="Ready - No model loaded")
+                self.send_btn.config(state=tk.NORMAL)
+            
+            elif msg_type == "system":
+                self.add_message(content, "system")
+            
+            elif msg_type == "status":
+                self.status_label.config(text=content)
+    
+    def _apply_stream(self, text: str):
+        """Append streamed text to the in-progress assistant message"""
+        if self._stream_entry is None:
+            # The cursor glyph goes in with the prefix as part of one insert
+            self.add_message("▌", "assistant")
+            self._stream_entry = self._visible_messages[-1]
+            
+            # Text goes in at stream_end, just ahead of the trailing cursor glyph
+            body = self._stream_entry[0] + self._ASSISTANT_BODY
+            self.chat_text.mark_set("stream_end", body)
+            
+            # Stay editable for the whole stream; _on_chat_key keeps the
+            # user from typing into it
+            self.chat_text.config(state=tk.NORMAL)
+        
+        self.update_streaming_response(text)
+    
+    def update_streaming_response(self, delta: str):
+        """Insert newly streamed text before the cursor"""
+        self.chat_text.insert("stream_end", delta)
+        self._schedule_see_end()
+    
+    def _schedule_see_end(self):
+        """Scroll to the end at most once per SEE_END_INTERVAL_MS"""
+        if not self._see_pending:
+            self._see_pending = True
+            self.root.after(self.SEE_END_INTERVAL_MS, self._see_end)
+    
+    def _see_end(self):
+        """Scroll the chat area to the end"""
+        self._see_pending = False
+        self.chat_text.see(tk.END)
+    
+    def _lock_chat(self):
+        """Make the chat area read-only unless a reply is streaming into it"""
+        if self._stream_entry is None:
+            self.chat_text.config(state=tk.DISABLED)
+    
+    def _on_chat_key(self, event):
+        """Block edits to the chat area while it is writable for streaming"""
+        if self._stream_entry is None:
+            return None
+        if event.keysym in self.CHAT_NAVIGATION_KEYS:
+            return None
+        if event.state & 0x4 and event.keysym.lower() in ('c', 'a'):
+            return None
+        return "break"
+    
+    def _finish_stream(self, content: Optional[str] = None):
+        """Drop the cursor and record the final text of the streamed message"""
+        if self._stream_entry is None:
             return
         
-        self.chat_text.config(state=tk.NORMAL)
-        # Replace the last message with updated content
-        self.chat_text.delete(self.response_start, tk.END)
-        self.chat_text.insert(tk.END, "Jarvis: ", "assistant")
-        self.chat_text.insert(tk.END, self.current_response + "▌")
+        if content is None:
+            body = self._stream_entry[0] + self._ASSISTANT_BODY
+            content = self.chat_text.get(body, "stream_end")
+        self.chat_text.delete("stream_end", "stream_end + 1c")
+        self.chat_text.mark_unset("stream_end")
+        self._stream_entry[2] = content
+        self._stream_entry = None
+        
+        self._trim_chat()
         self.chat_text.config(state=tk.DISABLED)
-        self.chat_text.see(tk.END)
+        self._schedule_see_end()
     
     def load_model(self, model_path: str):
         """Load a GGUF model"""
         try:
             self.status_label.config(text="Loading model...")
             self.add_message(f"Loading model: {model_path}", "system")
+            self.send_btn.config(state=tk.DISABLED)
             
-            # Load model in background
+            # Load model in background; completion is reported through the message queue
             threading.Thread(target=self._load_model_background, args=(model_path,), daemon=True).start()
             
         except Exception as e:
             self.add_message(f"Failed to load model: {e}", "error")
             self.status_label.config(text="Ready - No model loaded")
+            self.send_btn.config(state=tk.NORMAL)
     
     def _load_model_background(self, model_path: str):
         """Load model in background thread"""
         try:
-            if LocalLlm is None:
-                raise ImportError("llama-cpp-python not available")
+            LlmProcess, ChatSession = _ensure_llm()
             
-            self.llm = LocalLlm(model_path=model_path)
+            # Inference runs in its own process so decoding never holds the
+            # GIL the Tk main loop needs
+            previous = self.llm
+            self.llm = LlmProcess(model_path=model_path)
+            if previous is not None and hasattr(previous, 'close'):
+                previous.close()
             self.session = ChatSession()
             
-            self.message_queue.put(("system", f"Model loaded successfully: {Path(model_path).name}"))
-            self.message_queue.put(("status", "Ready - Model loaded"))
-            self.message_queue.put(("model", Path(model_path).name))
+            self.post_message("model_loaded", Path(model_path).name)
             
         except Exception as e:
-            self.message_queue.put(("error", f"Failed to load model: {e}"))
-            self.message_queue.put(("status", "Ready - No model loaded"))
+            self.post_message("model_error", str(e))
     
     def run(self):
         """Start the GUI main loop"""
@@ -8,20 +8,90 @@ from tkinter import ttk, filedialog, messagebox, scrolledtext
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 import json
-import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from .gui import shared_font
+from .embed_cache import content_hash
 from .rag_system import RAGSystem
 from .task_automation import TaskExecutor, TaskSolver
 
+# File dialog filters for Browse
+_BROWSE_FILETYPES = (
+    ("All supported", "*.pdf;*.docx;*.txt;*.md;*.html;*.py;*.js;*.json;*.yaml"),
+    ("PDF files", "*.pdf"),
+    ("Word documents", "*.docx"),
+    ("Text files", "*.txt"),
+    ("Markdown files", "*.md"),
+    ("HTML files", "*.html"),
+    ("Python files", "*.py"),
+    ("All files", "*.*"),
+)
+
+# Shared pool for knowledge base I/O, bounding concurrent embedding work
+_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="kb-io")
+
+
+class _QueryCache:
+    """LRU cache of search results keyed by normalized query text, with a TTL;
+    entries stored under an older knowledge base version are ignored"""
+    
+    def __init__(self, max_size: int = 256, ttl: float = 300.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+    
+    @staticmethod
+    def normalize(query: str) -> str:
+        return " ".join(query.lower().split())
+    
+    def get(self, query: str, version: int = 0) -> Optional[List[Dict[str, Any]]]:
+        """Return cached results for the query, or None"""
+        key = self.normalize(query)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_version, stored_at, results = entry
+        if stored_version != version or time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return [dict(result) for result in results]
+    
+    def put(self, query: str, results: List[Dict[str, Any]], version: int = 0) -> None:
+        """Store a copy of the results for the query"""
+        key = self.normalize(query)
+        self._entries[key] = (version, time.monotonic(), tuple(dict(result) for result in results))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
 
 class KnowledgeBaseManager:
     """GUI manager for the knowledge base"""
     
+    SEARCH_DEBOUNCE_MS = 150
+    # Documents sent to RAGSystem.add_documents per call
+    MAX_DOCUMENT_BATCH = 32
+    # Files at least this large are streamed in instead of loaded whole
+    STREAM_ADD_BYTES = 8 * 1024 * 1024
+    # Seconds a knowledge base stats scan is reused
+    STATS_TTL = 2.0
+    
     def __init__(self, parent_window, rag_system: RAGSystem, task_solver: TaskSolver = None):
         self.parent = parent_window
         self.rag_system = rag_system
         self.task_solver = task_solver
+        # Exact-match tier in front of RAGSystem.search's own semantic cache
+        self._query_cache = _QueryCache()
+        self._search_seq = 0
+        self._pending_search = None
+        # Bumped by every successful write; caches keyed on it go stale lazily
+        self._kb_version = 0
+        self._stats_cache = (-1, 0.0, None)
+        self._adds_in_flight = 0
         self.setup_ui()
     
     def setup_ui(self):
@@ -32,7 +102,7 @@ class KnowledgeBaseManager:
         
         # Title
         title_label = tk.Label(self.main_frame, text="Knowledge Base Manager", 
-                              font=('Segoe UI', 16, 'bold'), fg='white', bg='#1e1e1e')
+                              font=shared_font('Segoe UI', 16, 'bold'), fg='white', bg='#1e1e1e')
         title_label.pack(pady=(0, 20))
         
         # Stats frame
@@ -57,7 +127,7 @@ class KnowledgeBaseManager:
         stats_frame.pack(fill=tk.X, pady=(0, 10))
         
         self.stats_text = tk.Text(stats_frame, height=4, bg='#2d2d2d', fg='white',
-                                font=('Consolas', 9), state=tk.DISABLED)
+                                font=shared_font('Consolas', 9), state=tk.DISABLED)
         self.stats_text.pack(fill=tk.X, padx=5, pady=5)
     
     def create_add_documents_frame(self):
@@ -72,17 +142,20 @@ class KnowledgeBaseManager:
         
         self.file_path_var = tk.StringVar()
         file_entry = tk.Entry(file_frame, textvariable=self.file_path_var, 
-                            bg='#2d2d2d', fg='white', font=('Consolas', 10))
+                            bg='#2d2d2d', fg='white', font=shared_font('Consolas', 10))
         file_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
         
         browse_btn = tk.Button(file_frame, text="Browse", command=self.browse_file,
-                             bg='#4CAF50', fg='white', font=('Segoe UI', 10))
+                             bg='#4CAF50', fg='white', font=shared_font('Segoe UI', 10))
         browse_btn.pack(side=tk.RIGHT)
         
         # Add button
-        add_btn = tk.Button(add_frame, text="Add Document", command=self.add_document,
-                          bg='#2196F3', fg='white', font=('Segoe UI', 10, 'bold'))
-        add_btn.pack(pady=5)
+        self.add_btn = tk.Button(add_frame, text="Add Documents", command=self.add_document,
+                               bg='#2196F3', fg='white', font=shared_font('Segoe UI', 10, 'bold'))
+        self.add_btn.pack(pady=5)
+        
+        # Progress for adds in flight, packed only while one runs
+        self.progress = ttk.Progressbar(add_frame, mode='indeterminate')
         
         # Add text frame
         text_frame = ttk.LabelFrame(add_frame, text="Add Text", style='Main.TFrame')
@@ -90,11 +163,11 @@ class KnowledgeBaseManager:
         
         self.text_input = scrolledtext.ScrolledText(text_frame, height=4, 
                                                   bg='#2d2d2d', fg='white',
-                                                  font=('Consolas', 10))
+                                                  font=shared_font('Consolas', 10))
         self.text_input.pack(fill=tk.X, padx=5, pady=5)
         
         add_text_btn = tk.Button(text_frame, text="Add Text", command=self.add_text,
-                               bg='#FF9800', fg='white', font=('Segoe UI', 10))
+                               bg='#FF9800', fg='white', font=shared_font('Segoe UI', 10))
         add_text_btn.pack(pady=5)
     
     def create_search_frame(self):
@@ -109,19 +182,19 @@ class KnowledgeBaseManager:
         
         self.search_var = tk.StringVar()
         search_entry = tk.Entry(search_input_frame, textvariable=self.search_var,
-                              bg='#2d2d2d', fg='white', font=('Consolas', 10))
+                              bg='#2d2d2d', fg='white', font=shared_font('Consolas', 10))
         search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
-        search_entry.bind('<Return>', lambda e: self.search_knowledge_base())
+        search_entry.bind('<Return>', self._schedule_search)
         
         search_btn = tk.Button(search_input_frame, text="Search", 
-                             command=self.search_knowledge_base,
-                             bg='#9C27B0', fg='white', font=('Segoe UI', 10))
+                             command=self._schedule_search,
+                             bg='#9C27B0', fg='white', font=shared_font('Segoe UI', 10))
         search_btn.pack(side=tk.RIGHT)
         
         # Search results
         self.search_results = scrolledtext.ScrolledText(search_frame, height=6,
                                                       bg='#2d2d2d', fg='white',
-                                                      font=('Consolas', 9), state=tk.DISABLED)
+                                                      font=shared_font('Consolas', 9), state=tk.DISABLED)
         self.search_results.pack(fill=tk.X, padx=5, pady=5)
     
     def create_documents_list_frame(self):
@@ -135,7 +208,7 @@ class KnowledgeBaseManager:
         list_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         self.documents_listbox = tk.Listbox(list_frame, bg='#2d2d2d', fg='white',
-                                          font=('Consolas', 9), selectbackground='#404040')
+                                          font=shared_font('Consolas', 9), selectbackground='#404040')
         self.documents_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
         scrollbar = tk.Scrollbar(list_frame, orient=tk.VERTICAL, 
@@ -148,157 +221,231 @@ class KnowledgeBaseManager:
         button_frame.pack(fill=tk.X, padx=5, pady=5)
         
         refresh_btn = tk.Button(button_frame, text="Refresh", command=self.refresh_documents,
-                              bg='#607D8B', fg='white', font=('Segoe UI', 10))
+                              bg='#607D8B', fg='white', font=shared_font('Segoe UI', 10))
         refresh_btn.pack(side=tk.LEFT, padx=(0, 5))
         
         delete_btn = tk.Button(button_frame, text="Delete Selected", 
                              command=self.delete_selected_document,
-                             bg='#F44336', fg='white', font=('Segoe UI', 10))
+                             bg='#F44336', fg='white', font=shared_font('Segoe UI', 10))
         delete_btn.pack(side=tk.LEFT, padx=(0, 5))
         
         clear_btn = tk.Button(button_frame, text="Clear All", command=self.clear_knowledge_base,
-                            bg='#E91E63', fg='white', font=('Segoe UI', 10))
+                            bg='#E91E63', fg='white', font=shared_font('Segoe UI', 10))
         clear_btn.pack(side=tk.RIGHT)
     
     def browse_file(self):
         """Browse for file to add"""
-        filetypes = [
-            ("All supported", "*.pdf;*.docx;*.txt;*.md;*.html;*.py;*.js;*.json;*.yaml"),
-            ("PDF files", "*.pdf"),
-            ("Word documents", "*.docx"),
-            ("Text files", "*.txt"),
-            ("Markdown files", "*.md"),
-            ("HTML files", "*.html"),
-            ("Python files", "*.py"),
-            ("All files", "*.*")
-        ]
-        
-        filename = filedialog.askopenfilename(
-            title="Select Document to Add",
-            filetypes=filetypes
+        filenames = filedialog.askopenfilenames(
+            title="Select Documents to Add",
+            filetypes=_BROWSE_FILETYPES
         )
         
-        if filename:
-            self.file_path_var.set(filename)
+        if filenames:
+            self.file_path_var.set(";".join(filenames))
     
     def add_document(self):
-        """Add selected document to knowledge base"""
-        file_path = self.file_path_var.get().strip()
+        """Add the selected documents to knowledge base"""
+        file_paths = [p.strip() for p in self.file_path_var.get().split(";") if p.strip()]
         
-        if not file_path:
+        if not file_paths:
             messagebox.showwarning("No File", "Please select a file to add.")
             return
         
-        if not Path(file_path).exists():
-            messagebox.showerror("File Not Found", f"File not found: {file_path}")
+        missing = [p for p in file_paths if not Path(p).exists()]
+        if missing:
+            messagebox.showerror("File Not Found", "File not found: " + ", ".join(missing))
             return
         
-        # Add document in background thread
-        def add_doc_thread():
+        # Streamed files step the bar per stored batch; otherwise it just animates
+        streaming = any(Path(p).stat().st_size >= self.STREAM_ADD_BYTES for p in file_paths)
+        self._show_progress(animate=not streaming)
+        self._submit(self._handle_add_document_result, self._add_document_batches, file_paths)
+    
+    def _submit(self, handler, func, *args):
+        """Run func on the shared pool and pass its result to handler on the Tk thread"""
+        def done(future):
+            error = future.exception()
+            result = {"success": False, "error": str(error)} if error else future.result()
+            self.parent.after(0, handler, result)
+        
+        _EXECUTOR.submit(func, *args).add_done_callback(done)
+    
+    def _show_progress(self, animate: bool = True):
+        """Show the non-modal add progress bar"""
+        self._adds_in_flight += 1
+        self.progress.pack(fill=tk.X, padx=5, pady=(0, 5), after=self.add_btn)
+        if animate:
+            self.progress.start(50)
+    
+    def _hide_progress(self):
+        """Hide the add progress bar once no add is still running"""
+        self._adds_in_flight -= 1
+        if self._adds_in_flight <= 0:
+            self._adds_in_flight = 0
+            self.progress.stop()
+            self.progress.pack_forget()
+    
+    def _add_document_batches(self, file_paths: List[str]) -> Dict[str, Any]:
+        """Add documents MAX_DOCUMENT_BATCH at a time, embedding each batch in one
+        call; large files are streamed so they are never held in memory whole"""
+        result = {"success": False, "documents_added": 0, "chunks_added": 0, "results": {}}
+        large = [p for p in file_paths if Path(p).stat().st_size >= self.STREAM_ADD_BYTES]
+        small = [p for p in file_paths if p not in large]
+        
+        for start in range(0, len(small), self.MAX_DOCUMENT_BATCH):
+            batch = self.rag_system.add_documents(small[start:start + self.MAX_DOCUMENT_BATCH])
+            if "error" in batch:
+                raise RuntimeError(batch["error"])
+            result["success"] = result["success"] or batch["success"]
+            result["documents_added"] += batch["documents_added"]
+            result["chunks_added"] += batch["chunks_added"]
+            result["results"].update(batch["results"])
+        
+        for path in large:
+            chunks_added = 0
             try:
-                result = self.rag_system.add_document(file_path)
-                
-                # Update UI in main thread
-                self.parent.after(0, lambda: self._handle_add_document_result(result))
-                
+                for added in self.rag_system.add_document_stream(path):
+                    chunks_added += added
+                    self.parent.after(0, self.progress.step, added)
             except Exception as e:
-                self.parent.after(0, lambda: messagebox.showerror("Error", f"Error adding document: {e}"))
-        
-        threading.Thread(target=add_doc_thread, daemon=True).start()
-        
-        # Show progress
-        messagebox.showinfo("Adding Document", "Adding document to knowledge base...")
+                result["results"][path] = {"success": False, "error": str(e)}
+                continue
+            result["results"][path] = {"success": True, "chunks_added": chunks_added}
+            result["success"] = True
+            result["documents_added"] += 1
+            result["chunks_added"] += chunks_added
+        return result
     
     def _handle_add_document_result(self, result: Dict[str, Any]):
-        """Handle the result of adding a document"""
+        """Handle the result of adding documents"""
+        self._hide_progress()
+        failures = "\n".join(f"{Path(path).name}: {r.get('error', 'Unknown error')}"
+                             for path, r in result.get("results", {}).items() if not r.get("success"))
         if result.get("success", False):
-            messagebox.showinfo("Success", 
-                              f"Document added successfully!\n"
-                              f"Chunks added: {result.get('chunks_added', 0)}")
+            self._kb_version += 1
+            message = (f"Documents added: {result.get('documents_added', 0)}\n"
+                       f"Chunks added: {result.get('chunks_added', 0)}")
+            if failures:
+                message += f"\n\nNot added:\n{failures}"
+            messagebox.showinfo("Success", message)
             self.file_path_var.set("")
-            self.refresh_stats()
-            self.refresh_documents()
+            self._refresh_stats_and_docs()
         else:
-            messagebox.showerror("Error", f"Failed to add document: {result.get('error', 'Unknown error')}")
+            messagebox.showerror("Error", f"Failed to add document: {failures or result.get('error', 'Unknown error')}")
     
     def add_text(self):
         """Add text to knowledge base"""
-        text = self.text_input.get("1.0", tk.END).strip()
+        # An empty widget is caught by index before copying its contents out of Tk
+        text = "" if self.text_input.index("end-1c") == "1.0" else self.text_input.get("1.0", tk.END).strip()
         
         if not text:
             messagebox.showwarning("No Text", "Please enter some text to add.")
             return
         
-        # Add text in background thread
-        def add_text_thread():
-            try:
-                metadata = {
-                    "source": "manual_input",
-                    "added_at": datetime.now().isoformat(),
-                    "type": "text"
-                }
-                result = self.rag_system.add_text(text, metadata)
-                
-                # Update UI in main thread
-                self.parent.after(0, lambda: self._handle_add_text_result(result))
-                
-            except Exception as e:
-                self.parent.after(0, lambda: messagebox.showerror("Error", f"Error adding text: {e}"))
-        
-        threading.Thread(target=add_text_thread, daemon=True).start()
-        
-        # Show progress
-        messagebox.showinfo("Adding Text", "Adding text to knowledge base...")
+        metadata = {
+            "source": "manual_input",
+            "added_at": datetime.now().isoformat(),
+            "type": "text",
+            "content_hash": content_hash(text)
+        }
+        self._show_progress()
+        self._submit(self._handle_add_text_result, self.rag_system.add_text, text, metadata)
     
     def _handle_add_text_result(self, result: Dict[str, Any]):
         """Handle the result of adding text"""
+        self._hide_progress()
         if result.get("success", False):
+            self._kb_version += 1
             messagebox.showinfo("Success", 
                               f"Text added successfully!\n"
                               f"Chunks added: {result.get('chunks_added', 0)}")
             self.text_input.delete("1.0", tk.END)
-            self.refresh_stats()
-            self.refresh_documents()
+            self._refresh_stats_and_docs()
         else:
             messagebox.showerror("Error", f"Failed to add text: {result.get('error', 'Unknown error')}")
     
+    def _schedule_search(self, event=None):
+        """Debounce Enter presses and Search clicks into a single search"""
+        if self._pending_search is not None:
+            self.parent.after_cancel(self._pending_search)
+        self._pending_search = self.parent.after(self.SEARCH_DEBOUNCE_MS, self.search_knowledge_base)
+    
     def search_knowledge_base(self):
         """Search the knowledge base"""
+        self._pending_search = None
         query = self.search_var.get().strip()
         
         if not query:
             messagebox.showwarning("No Query", "Please enter a search query.")
             return
         
-        try:
-            results = self.rag_system.search(query, n_results=5)
-            
-            # Display results
-            self.search_results.config(state=tk.NORMAL)
-            self.search_results.delete("1.0", tk.END)
-            
-            if results:
-                self.search_results.insert(tk.END, f"Search Results for: '{query}'\n")
-                self.search_results.insert(tk.END, "=" * 50 + "\n\n")
-                
-                for i, result in enumerate(results, 1):
-                    self.search_results.insert(tk.END, f"Result {i}:\n")
-                    self.search_results.insert(tk.END, f"Source: {result['metadata'].get('name', 'Unknown')}\n")
-                    self.search_results.insert(tk.END, f"Relevance: {1 - result['distance']:.2f}\n")
-                    self.search_results.insert(tk.END, f"Text: {result['text'][:200]}...\n")
-                    self.search_results.insert(tk.END, "-" * 30 + "\n\n")
-            else:
-                self.search_results.insert(tk.END, f"No results found for: '{query}'\n")
-            
-            self.search_results.config(state=tk.DISABLED)
-            
-        except Exception as e:
-            messagebox.showerror("Search Error", f"Error searching knowledge base: {e}")
+        # Newer searches supersede any still running
+        self._search_seq += 1
+        seq = self._search_seq
+        
+        version = self._kb_version
+        results = self._query_cache.get(query, version)
+        if results is not None:
+            self._render_results(seq, query, results, version)
+            return
+        
+        # Search on the shared pool
+        def search_thread():
+            try:
+                results = self.rag_system.search(query, n_results=5)
+                self.parent.after(0, self._render_results, seq, query, results, version)
+            except Exception as e:
+                self.parent.after(0, self._handle_search_error, seq, e)
+        
+        _EXECUTOR.submit(search_thread)
+    
+    def _handle_search_error(self, seq: int, error: Exception):
+        """Report a failed search unless a newer one has started"""
+        if seq == self._search_seq:
+            messagebox.showerror("Search Error", f"Error searching knowledge base: {error}")
+    
+    def _render_results(self, seq: int, query: str, results: List[Dict[str, Any]], version: int):
+        """Display search results unless a newer search has started"""
+        if seq != self._search_seq:
+            return
+        self._query_cache.put(query, results, version)
+        
+        # Display results
+        self.search_results.config(state=tk.NORMAL)
+        self.search_results.delete("1.0", tk.END)
+        
+        if results:
+            # Build the whole listing and insert it in one Tk call
+            lines = [f"Search Results for: '{query}'\n", "=" * 50 + "\n\n"]
+            for i, result in enumerate(results, 1):
+                lines.append(f"Result {i}:\n"
+                             f"Source: {result['metadata'].get('name', 'Unknown')}\n"
+                             f"Relevance: {1 - result['distance']:.2f}\n"
+                             f"Text: {result['text'][:200]}...\n"
+                             + "-" * 30 + "\n\n")
+            self.search_results.insert(tk.END, "".join(lines))
+        else:
+            self.search_results.insert(tk.END, f"No results found for: '{query}'\n")
+        
+        self.search_results.config(state=tk.DISABLED)
+    
+    def _get_stats(self) -> Dict[str, Any]:
+        """Knowledge base stats, reused for STATS_TTL seconds until the next write"""
+        version, fetched_at, stats = self._stats_cache
+        if version != self._kb_version or time.monotonic() - fetched_at >= self.STATS_TTL:
+            stats = self.rag_system.get_knowledge_base_stats()
+            self._stats_cache = (self._kb_version, time.monotonic(), stats)
+        return stats
+    
+    def _refresh_stats_and_docs(self):
+        """Refetch stats once after a change and update both views"""
+        self.refresh_stats()
+        self.refresh_documents()
     
     def refresh_stats(self):
         """Refresh knowledge base statistics"""
         try:
-            stats = self.rag_system.get_knowledge_base_stats()
+            stats = self._get_stats()
             
             self.stats_text.config(state=tk.NORMAL)
             self.stats_text.delete("1.0", tk.END)
@@ -306,10 +453,11 @@ class KnowledgeBaseManager:
             if "error" in stats:
                 self.stats_text.insert(tk.END, f"Error: {stats['error']}\n")
             else:
-                self.stats_text.insert(tk.END, f"Total Chunks: {stats.get('total_chunks', 0)}\n")
-                self.stats_text.insert(tk.END, f"Unique Sources: {stats.get('unique_sources', 0)}\n")
-                self.stats_text.insert(tk.END, f"File Types: {', '.join(stats.get('file_types', []))}\n")
-                self.stats_text.insert(tk.END, f"Sources: {', '.join(stats.get('sources', []))}\n")
+                self.stats_text.insert(tk.END,
+                                       f"Total Chunks: {stats.get('total_chunks', 0)}\n"
+                                       f"Unique Sources: {stats.get('unique_sources', 0)}\n"
+                                       f"File Types: {', '.join(stats.get('file_types', []))}\n"
+                                       f"Sources: {', '.join(stats.get('sources', []))}\n")
             
             self.stats_text.config(state=tk.DISABLED)
             
@@ -322,14 +470,16 @@ class KnowledgeBaseManager:
     def refresh_documents(self):
         """Refresh documents list"""
         try:
-            stats = self.rag_system.get_knowledge_base_stats()
+            stats = self._get_stats()
+            sources = () if "error" in stats else tuple(stats.get('sources', []))
             
-            self.documents_listbox.delete(0, tk.END)
+            # Leave the list (and its selection) alone when nothing changed
+            if sources == self.documents_listbox.get(0, tk.END):
+                return
             
-            if "error" not in stats:
-                sources = stats.get('sources', [])
-                for source in sources:
-                    self.documents_listbox.insert(tk.END, source)
+            self.documents_listbox.delete(0, tk.END)
+            if sources:
+                self.documents_listbox.insert(tk.END, *sources)
             
         except Exception as e:
             messagebox.showerror("Error", f"Error refreshing documents: {e}")
@@ -345,37 +495,36 @@ class KnowledgeBaseManager:
         selected_doc = self.documents_listbox.get(selection[0])
         
         if messagebox.askyesno("Confirm Delete", f"Delete document '{selected_doc}' from knowledge base?"):
-            try:
-                # Find the full path for the document
-                # This is a simplified approach - in practice, you'd need to track paths
-                result = self.rag_system.delete_document(selected_doc)
-                
-                if result.get("success", False):
-                    messagebox.showinfo("Success", f"Deleted {result.get('chunks_deleted', 0)} chunks")
-                    self.refresh_stats()
-                    self.refresh_documents()
-                else:
-                    messagebox.showerror("Error", f"Failed to delete document: {result.get('error', 'Unknown error')}")
-                    
-            except Exception as e:
-                messagebox.showerror("Error", f"Error deleting document: {e}")
+            # Find the full path for the document
+            # This is a simplified approach - in practice, you'd need to track paths
+            self._show_progress()
+            self._submit(self._handle_delete_result, self.rag_system.delete_document, selected_doc)
+    
+    def _handle_delete_result(self, result: Dict[str, Any]):
+        """Handle the result of deleting a document"""
+        self._hide_progress()
+        if result.get("success", False):
+            self._kb_version += 1
+            messagebox.showinfo("Success", f"Deleted {result.get('chunks_deleted', 0)} chunks")
+            self._refresh_stats_and_docs()
+        else:
+            messagebox.showerror("Error", f"Failed to delete document: {result.get('error', 'Unknown error')}")
     
     def clear_knowledge_base(self):
         """Clear the entire knowledge base"""
         if messagebox.askyesno("Confirm Clear", "Clear the entire knowledge base? This cannot be undone."):
-            try:
-                result = self.rag_system.clear_knowledge_base()
-                
-                if result.get("success", False):
-                    messagebox.showinfo("Success", "Knowledge base cleared successfully")
-                    self.refresh_stats()
-                    self.refresh_documents()
-                else:
-                    messagebox.showerror("Error", f"Failed to clear knowledge base: {result.get('error', 'Unknown error')}")
-                    
-            except Exception as e:
-                messagebox.showerror("Error", f"Error clearing knowledge base: {e}")
-
+            self._show_progress()
+            self._submit(self._handle_clear_result, self.rag_system.clear_knowledge_base)
+    
+    def _handle_clear_result(self, result: Dict[str, Any]):
+        """Handle the result of clearing the knowledge base"""
+        self._hide_progress()
+        if result.get("success", False):
+            self._kb_version += 1
+            messagebox.showinfo("Success", "Knowledge base cleared successfully")
+            self._refresh_stats_and_docs()
+        else:
+            messagebox.showerror("Error", f"Failed to clear knowledge base: {result.get('error', 'Unknown error')}")
 
 def create_knowledge_base_window(parent, rag_system: RAGSystem, task_solver: TaskSolver = None):
     """Create a new window for knowledge base management"""
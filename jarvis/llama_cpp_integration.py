@@ -4,18 +4,28 @@ Uses native llama.cpp for optimal performance and compatibility
 """
 
 import os
+import shutil
 import subprocess
 import json
 import requests
+from requests.adapters import HTTPAdapter
 import threading
 import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict, List, Any, Generator
+from types import MappingProxyType
+from typing import Optional, Dict, List, Any, Generator, Mapping, Tuple
 import logging
 from urllib.parse import urljoin
 
 logger = logging.getLogger(__name__)
 
+# Seconds a check_llama_cpp_installation result is reused
+INSTALL_CHECK_TTL = 30.0
+_install_check = {"ts": 0.0, "val": None}
+# Executables whose presence means llama.cpp is installed
+LLAMA_CPP_BINARIES = ("llama-server", "llama-cli")
+
 
 class LlamaCppServer:
     """Manages llama.cpp server for optimal performance"""
@@ -27,6 +37,9 @@ class LlamaCppServer:
         self.server_process = None
         self.server_url = f"http://{host}:{port}"
         self.is_running = False
+        # Keep-alive connections to the server, reused by every request
+        self._http = requests.Session()
+        self._http.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
         
     def start_server(self, gpu_layers: int = 0, context_size: int = 4096, 
                     threads: Optional[int] = None) -> bool:
@@ -78,6 +91,7 @@ class LlamaCppServer:
             self.server_process.terminate()
             self.server_process.wait()
             self.is_running = False
+            self._http.close()
             logger.info("llama.cpp server stopped")
     
     def _find_llama_server(self) -> Optional[str]:
@@ -93,14 +107,12 @@ class LlamaCppServer:
             "/opt/homebrew/bin/llama-server"
         ]
         
+        # A lookup, not a launch: which() checks PATH for bare names and the
+        # file itself for the rest
         for path in possible_paths:
-            try:
-                result = subprocess.run([path, "--help"], 
-                                      capture_output=True, timeout=5)
-                if result.returncode == 0:
-                    return path
-            except (subprocess.TimeoutExpired, FileNotFoundError):
-                continue
+            found = shutil.which(path)
+            if found:
+                return found
         
         return None
     
@@ -109,7 +121,7 @@ class LlamaCppServer:
         start_time = time.time()
         while time.time() - start_time < timeout:
             try:
-                response = requests.get(f"{self.server_url}/health", timeout=1)
+                response = self._http.get(f"{self.server_url}/health", timeout=1)
                 if response.status_code == 200:
                     return True
             except requests.exceptions.RequestException:
@@ -133,29 +145,30 @@ class LlamaCppServer:
         
         try:
             if stream:
-                response = requests.post(
+                # Closing the response returns its connection to the pool,
+                # even if the caller stops reading early
+                with self._http.post(
                     f"{self.server_url}/v1/chat/completions",
                     json=payload,
                     stream=True,
                     timeout=30
-                )
-                
-                if response.status_code == 200:
-                    for line in response.iter_lines():
-                        if line:
-                            try:
-                                data = json.loads(line.decode('utf-8'))
-                                if 'choices' in data and len(data['choices']) > 0:
-                                    delta = data['choices'][0].get('delta', {})
-                                    content = delta.get('content', '')
-                                    if content:
-                                        yield content
-                            except json.JSONDecodeError:
-                                continue
-                else:
-                    logger.error(f"Server error: {response.status_code}")
+                ) as response:
+                    if response.status_code == 200:
+                        for line in response.iter_lines():
+                            if line:
+                                try:
+                                    data = json.loads(line.decode('utf-8'))
+                                    if 'choices' in data and len(data['choices']) > 0:
+                                        delta = data['choices'][0].get('delta', {})
+                                        content = delta.get('content', '')
+                                        if content:
+                                            yield content
+                                except json.JSONDecodeError:
+                                    continue
+                    else:
+                        logger.error(f"Server error: {response.status_code}")
             else:
-                response = requests.post(
+                response = self._http.post(
                     f"{self.server_url}/v1/chat/completions",
                     json=payload,
                     timeout=30
@@ -266,7 +279,10 @@ class LlamaCppInstaller:
                 text=True,
                 timeout=300
             )
-            return result.returncode == 0
+            if result.returncode == 0:
+                invalidate_installation_cache()
+                return True
+            return False
         except Exception as e:
             logger.error(f"Error installing llama.cpp: {e}")
             return False
@@ -281,7 +297,10 @@ class LlamaCppInstaller:
                 text=True,
                 timeout=300
             )
-            return result.returncode == 0
+            if result.returncode == 0:
+                invalidate_installation_cache()
+                return True
+            return False
         except Exception as e:
             logger.error(f"Error installing llama.cpp: {e}")
             return False
@@ -291,24 +310,26 @@ class LlamaCppInstaller:
         """Build llama.cpp from source"""
         try:
             # Clone repository
-            if not os.path.exists("llama.cpp"):
+            if not os.path.isdir("llama.cpp"):
                 subprocess.run(["git", "clone", "https://github.com/ggerganov/llama.cpp.git"])
             
-            os.chdir("llama.cpp")
-            
-            # Build
-            subprocess.run(["cmake", "-B", "build"])
-            subprocess.run(["cmake", "--build", "build", "--config", "Release"])
+            # Build inside llama.cpp via cwd= rather than changing our own
+            # directory, which would move every other thread too
+            subprocess.run(["cmake", "-B", "build"], cwd="llama.cpp")
+            subprocess.run(["cmake", "--build", "build", "--config", "Release",
+                            "-j", str(os.cpu_count() or 4)], cwd="llama.cpp")
             
+            invalidate_installation_cache()
             return True
         except Exception as e:
             logger.error(f"Error building from source: {e}")
             return False
 
 
-def get_recommended_models() -> List[Dict[str, str]]:
-    """Get list of recommended GGUF models"""
-    return [
+@lru_cache(maxsize=1)
+def get_recommended_models() -> Tuple[Mapping[str, str], ...]:
+    """Get recommended GGUF models (built once, read-only so it can be shared)"""
+    return tuple(MappingProxyType(model) for model in [
         {
             "name": "Llama 3.2 3B Instruct",
             "repo": "bartowski/Llama-3.2-3B-Instruct-GGUF",
@@ -344,44 +365,58 @@ def get_recommended_models() -> List[Dict[str, str]]:
             "size": "7B",
             "description": "Specialized for coding tasks"
         }
-    ]
+    ])
+
+
+def invalidate_installation_cache():
+    """Forget the last installation check, e.g. after installing llama.cpp"""
+    _install_check["ts"] = 0.0
+    _install_check["val"] = None
 
 
-def check_llama_cpp_installation() -> Dict[str, Any]:
-    """Check if llama.cpp is installed and working"""
+def check_llama_cpp_installation(detailed: bool = False) -> Dict[str, Any]:
+    """Check if llama.cpp is installed, reusing a recent check; detailed also
+    asks the binary for its version"""
+    now = time.monotonic()
+    cached = _install_check["val"]
+    if (cached is not None and now - _install_check["ts"] < INSTALL_CHECK_TTL
+            and (not detailed or not cached["installed"] or cached["version"] is not None)):
+        return dict(cached)
+    
+    # Finding the binaries on PATH is enough to know they are installed
+    paths = find_llama_cpp_binaries()
+    server_path = paths["llama-server"]
+    cli_path = paths["llama-cli"]
     result = {
-        "installed": False,
+        "installed": bool(server_path or cli_path),
         "version": None,
-        "server_path": None,
-        "cli_path": None
+        "server_path": server_path,
+        "cli_path": cli_path
     }
+    if detailed and result["installed"]:
+        result["version"] = _llama_cpp_version(server_path or cli_path)
     
-    # Check for llama-server
-    try:
-        server_result = subprocess.run(
-            ["llama-server", "--help"],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if server_result.returncode == 0:
-            result["installed"] = True
-            result["server_path"] = "llama-server"
-    except (subprocess.TimeoutExpired, FileNotFoundError):
-        pass
-    
-    # Check for llama-cli
+    _install_check["ts"] = now
+    _install_check["val"] = result
+    return dict(result)
+
+
+def find_llama_cpp_binaries() -> Dict[str, Optional[str]]:
+    """Path of each llama.cpp binary on PATH, None for those not found"""
+    # An in-process PATH lookup, so no `where`/`command -v` process is needed
+    return {name: shutil.which(name) for name in LLAMA_CPP_BINARIES}
+
+
+def _llama_cpp_version(executable: str) -> Optional[str]:
+    """First line of `executable --version`, which llama.cpp prints to stderr"""
     try:
-        cli_result = subprocess.run(
-            ["llama-cli", "--help"],
+        version_result = subprocess.run(
+            [executable, "--version"],
             capture_output=True,
             text=True,
             timeout=5
         )
-        if cli_result.returncode == 0:
-            result["installed"] = True
-            result["cli_path"] = "llama-cli"
-    except (subprocess.TimeoutExpired, FileNotFoundError):
-        pass
-    
-    return result
+    except (subprocess.TimeoutExpired, OSError):
+        return None
+    lines = (version_result.stdout + version_result.stderr).strip().splitlines()
+    return lines[0] if lines else None
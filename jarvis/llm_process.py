@@ -0,0 +1,115 @@
+"""
+Out-of-process LLM inference for Terminal Jarvis
+Runs LocalLlm in a child process so token generation never competes with
+the GUI's Tk event loop for the GIL
+"""
+
+import multiprocessing
+import threading
+from typing import Dict, Iterator, List, Optional
+
+
+def _serve(conn, model_kwargs: Dict):
+    """Child process: load the model and answer chat requests over the pipe"""
+    try:
+        from .chat import LocalLlm
+        llm = LocalLlm(**model_kwargs)
+    except Exception as e:
+        conn.send(("error", str(e)))
+        conn.close()
+        return
+    conn.send(("ready", None))
+
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+
+        messages, max_tokens, temperature = request
+        try:
+            for piece in llm.stream_chat(messages, max_tokens=max_tokens, temperature=temperature):
+                conn.send(("token", piece))
+            conn.send(("done", None))
+        except Exception as e:
+            conn.send(("error", str(e)))
+    conn.close()
+
+
+class LlmProcess:
+    """LocalLlm lookalike whose model lives in a dedicated child process"""
+
+    def __init__(self, model_path: str, context_length: int = 4096,
+                 gpu_layers: int = 0, threads: Optional[int] = None):
+        self.model_path = model_path
+        self.context_length = context_length
+        self.gpu_layers = gpu_layers
+        self.threads = threads
+
+        self._conn, child_conn = multiprocessing.Pipe()
+        self._lock = threading.Lock()
+        self._process = multiprocessing.Process(
+            target=_serve,
+            args=(child_conn, {
+                'model_path': model_path,
+                'context_length': context_length,
+                'gpu_layers': gpu_layers,
+                'threads': threads,
+            }),
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+
+        # Block until the child has the model loaded
+        try:
+            status, detail = self._conn.recv()
+        except EOFError:
+            status, detail = "error", "inference process exited during model load"
+        if status != "ready":
+            self.close()
+            raise RuntimeError(detail)
+
+    def stream_chat(self, messages: List[Dict[str, str]], max_tokens: int = 1024,
+                    temperature: float = 0.7) -> Iterator[str]:
+        """Stream a chat completion from the child process"""
+        with self._lock:
+            self._conn.send((list(messages), max_tokens, temperature))
+            finished = False
+            try:
+                while True:
+                    try:
+                        status, detail = self._conn.recv()
+                    except EOFError:
+                        finished = True
+                        raise RuntimeError("inference process exited")
+                    if status == "token":
+                        yield detail
+                    elif status == "done":
+                        finished = True
+                        return
+                    else:
+                        finished = True
+                        raise RuntimeError(detail)
+            finally:
+                # Consume the rest of an abandoned stream so the next request
+                # doesn't read stale tokens
+                while not finished:
+                    try:
+                        status, _ = self._conn.recv()
+                    except EOFError:
+                        break
+                    finished = status != "token"
+
+    def close(self):
+        """Stop the inference process"""
+        try:
+            self._conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self._conn.close()
+        self._process.join(timeout=5)
+        if self._process.is_alive():
+            self._process.terminate()
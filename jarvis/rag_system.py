@@ -6,8 +6,10 @@ Handles document ingestion, vector storage, and semantic search
 import os
 import json
 import hashlib
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 import logging
 from datetime import datetime
 
@@ -22,6 +24,8 @@ import markdown
 import psutil
 import requests
 
+from .embed_cache import EmbeddingCache, content_hash
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -36,10 +40,7 @@ class DocumentProcessor:
         try:
             with open(file_path, 'rb') as file:
                 reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in reader.pages:
-                    text += page.extract_text() + "\n"
-                return text
+                return "".join(page.extract_text() + "\n" for page in reader.pages)
         except Exception as e:
             logger.error(f"Error extracting PDF {file_path}: {e}")
             return ""
@@ -49,10 +50,7 @@ class DocumentProcessor:
         """Extract text from DOCX file"""
         try:
             doc = Document(file_path)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text
+            return "".join(paragraph.text + "\n" for paragraph in doc.paragraphs)
         except Exception as e:
             logger.error(f"Error extracting DOCX {file_path}: {e}")
             return ""
@@ -91,6 +89,38 @@ class DocumentProcessor:
             logger.error(f"Error extracting TXT {file_path}: {e}")
             return ""
     
+    @staticmethod
+    def file_info(file_path: Path) -> Dict[str, Any]:
+        """Basic metadata for a file on disk"""
+        stat = file_path.stat()
+        return {
+            "path": str(file_path),
+            "name": file_path.name,
+            "size": stat.st_size,
+            "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+            "extension": file_path.suffix.lower()
+        }
+    
+    @classmethod
+    def iter_text(cls, file_path: str, block_size: int = 1 << 20) -> Iterator[str]:
+        """Yield a file's text piece by piece: PDF pages, plain-text blocks,
+        or the whole text for formats that must be parsed in one go"""
+        path = Path(file_path)
+        extension = path.suffix.lower()
+        if extension == '.pdf':
+            with open(path, 'rb') as file:
+                for page in PyPDF2.PdfReader(file).pages:
+                    yield page.extract_text() + "\n"
+        elif extension in ['.txt', '.py', '.js', '.css', '.json', '.yaml', '.yml']:
+            with open(path, 'r', encoding='utf-8') as file:
+                for block in iter(lambda: file.read(block_size), ""):
+                    yield block
+        else:
+            doc_info = cls.process_file(file_path)
+            if "error" in doc_info:
+                raise ValueError(doc_info["error"])
+            yield doc_info["text"]
+    
     @classmethod
     def process_file(cls, file_path: str) -> Dict[str, Any]:
         """Process any supported file type and extract text"""
@@ -100,13 +130,7 @@ class DocumentProcessor:
             return {"error": "File not found"}
         
         # Get file info
-        file_info = {
-            "path": str(file_path),
-            "name": file_path.name,
-            "size": file_path.stat().st_size,
-            "modified": datetime.fromtimestamp(file_path.stat().st_mtime).isoformat(),
-            "extension": file_path.suffix.lower()
-        }
+        file_info = cls.file_info(file_path)
         
         # Extract text based on file type
         text = ""
@@ -164,6 +188,122 @@ class TextChunker:
                 })
         
         return chunks
+    
+    def iter_chunks(self, pieces: Iterable[str], metadata: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Chunk a stream of text pieces the same way chunk_text chunks the
+        joined text, holding at most one chunk's worth of words"""
+        step = self.chunk_size - self.overlap
+        window: List[str] = []
+        start = 0
+        index = 0
+        tail = ""
+        
+        def make_chunk(words: List[str]) -> Dict[str, Any]:
+            chunk_metadata = metadata.copy()
+            chunk_metadata.update({
+                "chunk_index": index,
+                "chunk_size": len(words),
+                "start_word": start,
+                "end_word": start + len(words)
+            })
+            return {"text": " ".join(words), "metadata": chunk_metadata}
+        
+        for piece in pieces:
+            words = (tail + piece).split()
+            # A piece may end mid-word; carry the fragment into the next one
+            tail = words.pop() if words and piece and not piece[-1].isspace() else ""
+            window.extend(words)
+            while len(window) >= self.chunk_size:
+                yield make_chunk(window[:self.chunk_size])
+                index += 1
+                del window[:step]
+                start += step
+        
+        if tail:
+            window.append(tail)
+        while window:
+            yield make_chunk(window[:self.chunk_size])
+            index += 1
+            del window[:step]
+            start += step
+
+
+def _copy_results(results: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Copy search results so callers can't edit what the query cache holds"""
+    return [dict(result) for result in results]
+
+
+class SemanticQueryCache:
+    """Cache search results keyed by query embedding using random-projection LSH,
+    with an exact tier keyed by a hash of the quantized vector in front of it"""
+    
+    def __init__(self, dim: int, n_planes: int = 16, threshold: float = 0.95,
+                 max_buckets: int = 256, max_exact: int = 1024, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.projections = rng.standard_normal((dim, n_planes)).astype(np.float32)
+        self.threshold = threshold
+        self.max_buckets = max_buckets
+        self.max_exact = max_exact
+        self._buckets: "OrderedDict[Tuple, List[Tuple[np.ndarray, Any]]]" = OrderedDict()
+        self._exact: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _embed_hash(embedding: np.ndarray) -> int:
+        """Hash a normalized embedding quantized to three decimal places"""
+        return hash((embedding * 1000).astype(np.int32).tobytes())
+    
+    def _bucket_key(self, embedding: np.ndarray, key: Any) -> Tuple:
+        """Hash the embedding to its LSH signature"""
+        signature = np.packbits(embedding @ self.projections > 0).tobytes()
+        return (signature, key)
+    
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        embedding = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm else embedding
+    
+    def get(self, embedding: np.ndarray, key: Any = None) -> Optional[Any]:
+        """Return cached results for a near-identical query, or None"""
+        embedding = self._normalize(embedding)
+        exact_key = (self._embed_hash(embedding), key)
+        with self._lock:
+            value = self._exact.get(exact_key)
+            if value is not None:
+                self._exact.move_to_end(exact_key)
+                return value
+        bucket_key = self._bucket_key(embedding, key)
+        with self._lock:
+            bucket = self._buckets.get(bucket_key)
+            if not bucket:
+                return None
+            for cached_embedding, value in bucket:
+                if float(np.dot(embedding, cached_embedding)) >= self.threshold:
+                    self._buckets.move_to_end(bucket_key)
+                    return value
+        return None
+    
+    def put(self, embedding: np.ndarray, value: Any, key: Any = None) -> None:
+        """Store results for a query embedding"""
+        embedding = self._normalize(embedding)
+        exact_key = (self._embed_hash(embedding), key)
+        bucket_key = self._bucket_key(embedding, key)
+        with self._lock:
+            self._exact[exact_key] = value
+            self._exact.move_to_end(exact_key)
+            while len(self._exact) > self.max_exact:
+                self._exact.popitem(last=False)
+            self._buckets.setdefault(bucket_key, []).append((embedding, value))
+            self._buckets.move_to_end(bucket_key)
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Drop all cached results"""
+        with self._lock:
+            self._buckets.clear()
+            self._exact.clear()
 
 
 class RAGSystem:
@@ -180,7 +320,17 @@ class RAGSystem:
         )
         
         # Initialize embedding model
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.embedding_model_name = 'all-MiniLM-L6-v2'
+        self.embedding_model = SentenceTransformer(self.embedding_model_name)
+        
+        # Persistent embeddings for chunk texts already seen
+        self.embed_cache = EmbeddingCache(
+            self.embedding_model_name,
+            dim=self.embedding_model.get_sentence_embedding_dimension()
+        )
+        
+        # Semantic cache for repeated or paraphrased queries
+        self.query_cache = SemanticQueryCache(self.embedding_model.get_sentence_embedding_dimension())
         
         # Initialize document processor and chunker
         self.doc_processor = DocumentProcessor()
@@ -194,7 +344,19 @@ class RAGSystem:
         
         logger.info(f"RAG System initialized with {self.collection.count()} documents")
     
-    def add_document(self, file_path: str) -> Dict[str, Any]:
+    def _embed(self, texts: List[str], batch_size: int = 32) -> List[List[float]]:
+        """Embed chunk texts, running the model only on cache misses"""
+        embeddings = self.embed_cache.get_many(texts)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            computed = self.embedding_model.encode(missing_texts, batch_size=batch_size).tolist()
+            self.embed_cache.put_many(missing_texts, computed)
+            for i, embedding in zip(missing, computed):
+                embeddings[i] = embedding
+        return embeddings
+    
+    def add_document(self, file_path: str, embed_batch_size: int = 64) -> Dict[str, Any]:
         """Add a document to the knowledge base"""
         try:
             # Process the document
@@ -219,8 +381,8 @@ class RAGSystem:
             chunk_texts = [chunk["text"] for chunk in chunks]
             chunk_metadatas = [chunk["metadata"] for chunk in chunks]
             
-            # Generate embeddings
-            embeddings = self.embedding_model.encode(chunk_texts).tolist()
+            # Generate embeddings for all chunks in one vectorized call
+            embeddings = self._embed(chunk_texts, batch_size=embed_batch_size)
             
             # Add to collection
             self.collection.add(
@@ -230,6 +392,7 @@ class RAGSystem:
                 metadatas=chunk_metadatas
             )
             
+            self.query_cache.clear()
             logger.info(f"Added document {file_path} with {len(chunks)} chunks")
             
             return {
@@ -243,6 +406,113 @@ class RAGSystem:
             logger.error(f"Error adding document {file_path}: {e}")
             return {"success": False, "error": str(e)}
     
+    def add_document_stream(self, file_path: str, batch_size: int = 32) -> Iterator[int]:
+        """Add a large document without holding its full text, chunks or
+        embeddings in memory; yields the number of chunks stored per batch"""
+        path = Path(file_path)
+        if not path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        doc_id = hashlib.md5(file_path.encode()).hexdigest()
+        if self.collection.get(ids=[doc_id])["ids"]:
+            raise ValueError("Document already exists in knowledge base")
+        
+        chunks = self.chunker.iter_chunks(self.doc_processor.iter_text(file_path),
+                                          self.doc_processor.file_info(path))
+        added_ids: List[str] = []
+        try:
+            while True:
+                batch = []
+                for chunk in chunks:
+                    batch.append(chunk)
+                    if len(batch) == batch_size:
+                        break
+                if not batch:
+                    break
+                
+                chunk_ids = [f"{doc_id}_chunk_{len(added_ids) + i}" for i in range(len(batch))]
+                chunk_texts = [chunk["text"] for chunk in batch]
+                self.collection.add(
+                    ids=chunk_ids,
+                    embeddings=self._embed(chunk_texts, batch_size=batch_size),
+                    documents=chunk_texts,
+                    metadatas=[chunk["metadata"] for chunk in batch]
+                )
+                added_ids.extend(chunk_ids)
+                yield len(batch)
+        except BaseException:
+            # Don't leave a partial document behind
+            if added_ids:
+                self.collection.delete(ids=added_ids)
+            raise
+        finally:
+            if added_ids:
+                self.query_cache.clear()
+        
+        if not added_ids:
+            raise ValueError("No text content found")
+        logger.info(f"Streamed document {file_path} with {len(added_ids)} chunks")
+    
+    def add_documents(self, file_paths: List[str], embed_batch_size: int = 64) -> Dict[str, Any]:
+        """Add several documents to the knowledge base with one embedding pass"""
+        results: Dict[str, Dict[str, Any]] = {}
+        prepared = []
+        try:
+            for file_path in dict.fromkeys(file_paths):
+                doc_info = self.doc_processor.process_file(file_path)
+                if "error" in doc_info:
+                    results[file_path] = {"success": False, "error": doc_info["error"]}
+                    continue
+                doc_id = hashlib.md5(file_path.encode()).hexdigest()
+                prepared.append((file_path, doc_id, doc_info))
+            
+            # Check which documents already exist with a single lookup
+            if prepared:
+                existing = set(self.collection.get(ids=[doc_id for _, doc_id, _ in prepared])["ids"])
+            else:
+                existing = set()
+            
+            chunk_ids, chunk_texts, chunk_metadatas = [], [], []
+            for file_path, doc_id, doc_info in prepared:
+                if doc_id in existing:
+                    results[file_path] = {"success": False, "error": "Document already exists in knowledge base"}
+                    continue
+                chunks = self.chunker.chunk_text(doc_info["text"], doc_info)
+                chunk_ids.extend(f"{doc_id}_chunk_{i}" for i in range(len(chunks)))
+                chunk_texts.extend(chunk["text"] for chunk in chunks)
+                chunk_metadatas.extend(chunk["metadata"] for chunk in chunks)
+                results[file_path] = {
+                    "success": True,
+                    "document_id": doc_id,
+                    "chunks_added": len(chunks),
+                    "metadata": doc_info
+                }
+            
+            if chunk_texts:
+                # Chunks from every document are embedded together
+                embeddings = self._embed(chunk_texts, batch_size=embed_batch_size)
+                self.collection.add(
+                    ids=chunk_ids,
+                    embeddings=embeddings,
+                    documents=chunk_texts,
+                    metadatas=chunk_metadatas
+                )
+                self.query_cache.clear()
+            
+            added = [r for r in results.values() if r["success"]]
+            logger.info(f"Added {len(added)} documents with {len(chunk_texts)} chunks")
+            
+            return {
+                "success": bool(added),
+                "documents_added": len(added),
+                "chunks_added": len(chunk_texts),
+                "results": results
+            }
+            
+        except Exception as e:
+            logger.error(f"Error adding documents: {e}")
+            return {"success": False, "error": str(e), "results": results}
+    
     def add_text(self, text: str, metadata: Dict[str, Any] = None) -> Dict[str, Any]:
         """Add raw text to the knowledge base"""
         try:
@@ -254,6 +524,7 @@ class RAGSystem:
                 "added_at": datetime.now().isoformat(),
                 "type": "text"
             })
+            metadata.setdefault("content_hash", content_hash(text))
             
             # Generate ID
             text_id = hashlib.md5(text.encode()).hexdigest()
@@ -267,7 +538,7 @@ class RAGSystem:
             chunk_metadatas = [chunk["metadata"] for chunk in chunks]
             
             # Generate embeddings
-            embeddings = self.embedding_model.encode(chunk_texts).tolist()
+            embeddings = self._embed(chunk_texts)
             
             # Add to collection
             self.collection.add(
@@ -277,6 +548,7 @@ class RAGSystem:
                 metadatas=chunk_metadatas
             )
             
+            self.query_cache.clear()
             logger.info(f"Added text with {len(chunks)} chunks")
             
             return {
@@ -289,15 +561,25 @@ class RAGSystem:
             logger.error(f"Error adding text: {e}")
             return {"success": False, "error": str(e)}
     
+    def embed(self, text: str) -> np.ndarray:
+        """Embed a single query string"""
+        return self.embedding_model.encode([text])[0]
+    
     def search(self, query: str, n_results: int = 5, filter_metadata: Dict = None) -> List[Dict[str, Any]]:
         """Search the knowledge base for relevant information"""
         try:
             # Generate query embedding
-            query_embedding = self.embedding_model.encode([query]).tolist()[0]
+            query_embedding = self.embed(query)
+            
+            # Reuse results of a near-identical earlier query
+            cache_key = (n_results, json.dumps(filter_metadata, sort_keys=True) if filter_metadata else None)
+            cached = self.query_cache.get(query_embedding, cache_key)
+            if cached is not None:
+                return _copy_results(cached)
             
             # Search in ChromaDB
             results = self.collection.query(
-                query_embeddings=[query_embedding],
+                query_embeddings=[query_embedding.tolist()],
                 n_results=n_results,
                 where=filter_metadata
             )
@@ -312,6 +594,7 @@ class RAGSystem:
                     "distance": results["distances"][0][i]
                 })
             
+            self.query_cache.put(query_embedding, tuple(_copy_results(formatted_results)), cache_key)
             return formatted_results
             
         except Exception as e:
@@ -373,6 +656,7 @@ class RAGSystem:
             
             if chunk_ids_to_delete:
                 self.collection.delete(ids=chunk_ids_to_delete)
+                self.query_cache.clear()
                 logger.info(f"Deleted document {file_path} with {len(chunk_ids_to_delete)} chunks")
                 return {"success": True, "chunks_deleted": len(chunk_ids_to_delete)}
             else:
@@ -392,6 +676,7 @@ class RAGSystem:
                 metadata={"description": "Terminal Jarvis Knowledge Base"}
             )
             
+            self.query_cache.clear()
             logger.info("Knowledge base cleared")
             return {"success": True}
             
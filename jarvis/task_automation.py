@@ -3,123 +3,404 @@ Task Automation System for Terminal Jarvis
 Handles system tasks, environment setup, and automated actions
 """
 
+import atexit
+import copy
 import os
 import sys
 import subprocess
+import queue
+import re
+import threading
+import time
 import platform
-import json
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Union
 import logging
-import psutil
-import requests
-from datetime import datetime
+
+try:
+    import winreg
+except ImportError:
+    winreg = None
 
 logger = logging.getLogger(__name__)
 
+# The OS can't change while we run, so check it once
+_IS_WINDOWS = platform.system() == "Windows"
+
+# Characters that need a shell to interpret: pipes, redirection, chaining,
+# variables, globs, comments and quoting. A backslash escapes on POSIX but is
+# the path separator on Windows
+_SHELL_METACHARACTERS = frozenset('|&;<>()$`^%!*?[]{}~#"\'\n' + ("" if _IS_WINDOWS else "\\"))
+
+# Python311 or python3.11.exe -> major, minor
+_PYTHON_NAME_RE = re.compile(r"python(\d)\.?(\d+)", re.IGNORECASE)
+
+# Drive-rooted, rooted or ./ ../ relative paths
+_PATHLIKE_RE = re.compile(r"^(?:[A-Za-z]:[\\/]|\.{0,2}[\\/])")
+
+# Words after which the solvers look for a path or a command
+_PATH_ANCHORS = frozenset(("add", "to", "path"))
+_COMMAND_ANCHORS = frozenset(("run", "execute", "command"))
+
+# Filler that may stand where a package name is expected ("install the
+# requests package") and words that end the package list ("... for data analysis")
+_PACKAGE_FILLER = frozenset(("pip", "the", "package", "packages"))
+_PACKAGE_STOPWORDS = frozenset((
+    "for", "to", "so", "in", "on", "into", "with", "using", "via", "from", "because", "then"
+))
+# A PEP 508 name with optional extras and a single version clause
+_PACKAGE_NAME_RE = re.compile(
+    r"^[A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?(?:\[[A-Za-z0-9,._-]+\])?"
+    r"(?:(?:==|>=|<=|~=|!=|>|<)[A-Za-z0-9.*+!-]+)?$"
+)
+
+_UNINSTALL_KEY = r"Software\Microsoft\Windows\CurrentVersion\Uninstall"
+_UNINSTALL_WOW64_KEY = r"Software\Wow6432Node\Microsoft\Windows\CurrentVersion\Uninstall"
+
+
+# Task categories in priority order: (regex group, task type, confidence,
+# keyword patterns). Keywords start a word, so "venv" isn't "env" and "prune"
+# isn't "run"; compounds such as "PYTHONPATH", "reinstall", "uninstall"
+# and "rerun" are spelled out so they still match
+_TASK_CATEGORIES = (
+    ("path", "path_addition", 0.9, ("add to path", r"\w*path", "environment variable", "env")),
+    ("python", "python_setup", 0.8, ("python", "pip", "virtual environment", "venv")),
+    ("package", "package_installation", 0.8, (r"(?:re|un)?install", "package", "pip install")),
+    ("command", "system_command", 0.7, (r"(?:re)?run", "execute", "command", "cmd", "powershell")),
+)
+_TASK_TYPES = [(task_type, confidence) for _, task_type, confidence, _ in _TASK_CATEGORIES]
+_TASK_PRIORITY = {group: rank for rank, (group, _, _, _) in enumerate(_TASK_CATEGORIES)}
+# Zero-width at each word start so overlapping keywords from different
+# categories are all seen in one scan
+_TASK_KEYWORDS_RE = re.compile(
+    r"\b(?=" + "|".join(
+        f"(?P<{group}>" + "|".join(keywords) + ")"
+        for group, _, _, keywords in _TASK_CATEGORIES
+    ) + ")",
+    re.IGNORECASE
+)
+
+
+def _scandir(path: str) -> List[os.DirEntry]:
+    """List a directory, treating a missing or unreadable one as empty"""
+    try:
+        with os.scandir(path) as entries:
+            return list(entries)
+    except OSError:
+        return []
+
+
+@lru_cache(maxsize=1)
+def _os_info() -> Dict[str, str]:
+    """Operating system information, computed once per process"""
+    return {
+        "system": platform.system(),
+        "release": platform.release(),
+        "version": platform.version(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "python_version": platform.python_version()
+    }
+
+
+# Environment variables reported by SystemInfo.get_environment_variables
+_IMPORTANT_ENV_VARS = (
+    "PATH", "PYTHONPATH", "HOME", "USERPROFILE",
+    "APPDATA", "LOCALAPPDATA", "TEMP", "TMP"
+)
+
+
+def _read_environment() -> Dict[str, str]:
+    """The important environment variables that are set and non-empty"""
+    return {var: os.environ[var] for var in _IMPORTANT_ENV_VARS if os.environ.get(var)}
+
+
+# os.environ only changes when assigned to, so read it once here and refresh
+# wherever this module assigns to it
+_ENV_CACHE = _read_environment()
+
+
+def _set_session_path(value: str) -> None:
+    """Set PATH for this process and keep the environment snapshot in step"""
+    os.environ["PATH"] = value
+    _ENV_CACHE.clear()
+    _ENV_CACHE.update(_read_environment())
+
+
+class PowerShellSession:
+    """One long-lived powershell.exe that commands are streamed through, so
+    only the first command pays PowerShell's startup cost"""
+    
+    _SENTINEL = "__JARVIS_END__"
+    
+    def __init__(self):
+        self._process: Optional[subprocess.Popen] = None
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._lock = threading.Lock()
+        # PATH the child currently has; it copied ours at launch
+        self._path: Optional[str] = None
+    
+    def _start(self):
+        """Launch the PowerShell child and a thread draining its output"""
+        self._process = subprocess.Popen(
+            ["powershell", "-NoProfile", "-NoLogo", "-NonInteractive", "-Command", "-"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            text=True, bufsize=1,
+            # No console window flashing up when launched from the GUI
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)
+        )
+        self._lines = queue.Queue()
+        self._path = os.environ.get("PATH", "")
+        threading.Thread(target=self._pump, args=(self._process.stdout, self._lines), daemon=True).start()
+    
+    @staticmethod
+    def _pump(stream, lines):
+        for line in stream:
+            lines.put(line.rstrip("\r\n"))
+        lines.put(None)
+    
+    def run(self, command: str, timeout: float = 30) -> Tuple[bool, str]:
+        """Run one command; returns whether it succeeded and its combined output"""
+        with self._lock:
+            if self._process is None or self._process.poll() is not None:
+                self._start()
+            # The child keeps the environment it started with, so pass on
+            # PATH changes made in this process since then
+            path = os.environ.get("PATH", "")
+            if path != self._path:
+                quoted = path.replace("'", "''")
+                command = f"$env:PATH = '{quoted}'; {command}"
+                self._path = path
+            # One line, so PowerShell runs it as soon as it is read; errors are
+            # made terminating so the catch decides success
+            self._process.stdin.write(
+                f"try {{ $ErrorActionPreference = 'Stop'; {command} 2>&1 | Out-String -Stream; $__ok = $true }} "
+                f"catch {{ Write-Output $_; $__ok = $false }}; "
+                f"Write-Output \"{self._SENTINEL}$__ok\"\n"
+            )
+            self._process.stdin.flush()
+            
+            output = []
+            while True:
+                try:
+                    line = self._lines.get(timeout=timeout)
+                except queue.Empty:
+                    self.close()
+                    raise subprocess.TimeoutExpired(command, timeout)
+                if line is None:
+                    self._process = None
+                    return False, "\n".join(output)
+                if line.startswith(self._SENTINEL):
+                    return line[len(self._SENTINEL):] == "True", "\n".join(output)
+                output.append(line)
+    
+    def close(self):
+        """Stop the PowerShell child"""
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+            process.wait(timeout=5)
+        except Exception:
+            process.kill()
+
+
+# Shared by everything in this module that needs PowerShell
+_POWERSHELL = PowerShellSession()
+atexit.register(_POWERSHELL.close)
+
 
 class SystemInfo:
     """Get system information and environment details"""
     
     @staticmethod
     def get_os_info() -> Dict[str, str]:
-        """Get operating system information"""
-        return {
-            "system": platform.system(),
-            "release": platform.release(),
-            "version": platform.version(),
-            "machine": platform.machine(),
-            "processor": platform.processor(),
-            "python_version": platform.python_version()
-        }
+        """Get operating system information (a copy, safe to modify)"""
+        return _os_info().copy()
     
     @staticmethod
     def get_environment_variables() -> Dict[str, str]:
-        """Get important environment variables"""
-        important_vars = [
-            "PATH", "PYTHONPATH", "HOME", "USERPROFILE", 
-            "APPDATA", "LOCALAPPDATA", "TEMP", "TMP"
-        ]
-        
-        env_vars = {}
-        for var in important_vars:
-            value = os.environ.get(var, "")
-            if value:
-                env_vars[var] = value
-        
-        return env_vars
+        """Get important environment variables (a copy, safe to modify)"""
+        return _ENV_CACHE.copy()
     
     @staticmethod
     def get_installed_programs() -> List[str]:
-        """Get list of installed programs (Windows)"""
-        if platform.system() != "Windows":
+        """Get list of installed programs (Windows), cached until invalidate_cache;
+        the list is a copy, safe to modify"""
+        return list(SystemInfo._installed_programs())
+    
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _installed_programs() -> List[str]:
+        """Installed program names, shared by every caller"""
+        if not _IS_WINDOWS:
             return []
         
+        if winreg is not None:
+            try:
+                return SystemInfo._read_uninstall_keys()
+            except Exception as e:
+                logger.error(f"Error reading installed programs from registry: {e}")
+        
         try:
-            # Get installed programs from registry
-            result = subprocess.run([
-                "powershell", "-Command",
-                "Get-ItemProperty HKLM:\\Software\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\* | Select-Object DisplayName | Where-Object {$_.DisplayName -ne $null} | Sort-Object DisplayName"
-            ], capture_output=True, text=True, timeout=30)
+            # Fall back to asking PowerShell for the registry entries
+            # Read only DisplayName and expand it to plain strings, one per line
+            ok, output = _POWERSHELL.run(
+                "Get-ItemProperty HKLM:\\Software\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\* "
+                "-Name DisplayName -ErrorAction SilentlyContinue | Where-Object DisplayName | "
+                "Select-Object -ExpandProperty DisplayName | Sort-Object"
+            )
             
-            if result.returncode == 0:
-                programs = []
-                for line in result.stdout.split('\n'):
-                    if line.strip() and not line.startswith('DisplayName'):
-                        programs.append(line.strip())
-                return programs
+            if ok:
+                return [line.strip() for line in output.split('\n') if line.strip()]
         except Exception as e:
             logger.error(f"Error getting installed programs: {e}")
         
         return []
     
+    @staticmethod
+    def _read_uninstall_keys() -> List[str]:
+        """Read program display names straight from the Uninstall registry keys"""
+        hives = [
+            (winreg.HKEY_LOCAL_MACHINE, _UNINSTALL_KEY),
+            (winreg.HKEY_LOCAL_MACHINE, _UNINSTALL_WOW64_KEY),
+            (winreg.HKEY_CURRENT_USER, _UNINSTALL_KEY),
+        ]
+        programs = set()
+        for hive, key_path in hives:
+            try:
+                key = winreg.OpenKey(hive, key_path)
+            except OSError:
+                continue
+            with key:
+                for i in range(winreg.QueryInfoKey(key)[0]):
+                    try:
+                        with winreg.OpenKey(key, winreg.EnumKey(key, i)) as subkey:
+                            name, _ = winreg.QueryValueEx(subkey, "DisplayName")
+                    except OSError:
+                        continue
+                    if name:
+                        programs.add(name.strip())
+        return sorted(programs)
+    
+    @staticmethod
+    def _python_version(executable: str, name: str) -> Optional[str]:
+        """Version of a Python install, read from its directory or file name
+        (Python311, python3.11.exe) and only asked of the interpreter otherwise"""
+        match = _PYTHON_NAME_RE.match(name)
+        if match:
+            return f"Python {match.group(1)}.{match.group(2)}"
+        try:
+            result = subprocess.run([executable, "--version"],
+                                    capture_output=True, text=True, timeout=5)
+        except (OSError, subprocess.SubprocessError):
+            return None
+        return result.stdout.strip() if result.returncode == 0 else None
+    
     @staticmethod
     def get_python_installations() -> List[Dict[str, str]]:
-        """Find all Python installations on the system"""
-        python_installations = []
+        """Find all Python installations on the system, cached until invalidate_cache;
+        the list and its dicts are copies, safe to modify"""
+        return [dict(install) for install in SystemInfo._python_installations()]
+    
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _python_installations() -> List[Dict[str, str]]:
+        """Python installations, shared by every caller"""
+        if not _IS_WINDOWS:
+            return []
         
-        # Check common Python installation paths
-        common_paths = [
-            "C:\\Python*",
-            "C:\\Program Files\\Python*",
-            "C:\\Program Files (x86)\\Python*",
-            "C:\\Users\\*\\AppData\\Local\\Programs\\Python\\Python*",
-            "C:\\Users\\*\\AppData\\Local\\Microsoft\\WindowsApps\\python*.exe"
-        ]
+        # Install directories named Python* under these roots hold python.exe
+        install_roots = ["C:\\", "C:\\Program Files", "C:\\Program Files (x86)"]
+        # Store aliases such as python3.11.exe live directly in these
+        alias_dirs = []
+        for user in _scandir("C:\\Users"):
+            if user.is_dir():
+                local = os.path.join(user.path, "AppData", "Local")
+                install_roots.append(os.path.join(local, "Programs", "Python"))
+                alias_dirs.append(os.path.join(local, "Microsoft", "WindowsApps"))
+        
+        candidates = []
+        for root in install_roots:
+            for entry in _scandir(root):
+                if entry.name.lower().startswith("python") and entry.is_dir():
+                    executable = os.path.join(entry.path, "python.exe")
+                    if os.path.isfile(executable):
+                        candidates.append((executable, entry.name))
+        for alias_dir in alias_dirs:
+            for entry in _scandir(alias_dir):
+                name = entry.name.lower()
+                if name.startswith("python") and name.endswith(".exe"):
+                    candidates.append((entry.path, entry.name))
+        
+        if not candidates:
+            return []
         
-        for pattern in common_paths:
-            try:
-                import glob
-                paths = glob.glob(pattern)
-                for path in paths:
-                    if os.path.isfile(path) and "python" in path.lower():
-                        try:
-                            # Get Python version
-                            result = subprocess.run([path, "--version"], 
-                                                  capture_output=True, text=True, timeout=5)
-                            if result.returncode == 0:
-                                version = result.stdout.strip()
-                                python_installations.append({
-                                    "path": path,
-                                    "version": version,
-                                    "executable": path
-                                })
-                        except:
-                            pass
-            except Exception as e:
-                logger.error(f"Error checking Python path {pattern}: {e}")
+        # Installs whose name doesn't give the version each fork an
+        # interpreter; those waits are independent, so overlap them
+        executables = [executable for executable, _ in candidates]
+        names = [name for _, name in candidates]
+        with ThreadPoolExecutor(max_workers=min(8, len(candidates))) as pool:
+            versions = list(pool.map(SystemInfo._python_version, executables, names))
+        
+        python_installations = []
+        for executable, version in zip(executables, versions):
+            if version:
+                python_installations.append({
+                    "path": executable,
+                    "version": version,
+                    "executable": executable
+                })
         
         return python_installations
+    
+    @classmethod
+    def invalidate_cache(cls):
+        """Forget installed programs and Python installs, e.g. after installing one"""
+        cls._installed_programs.cache_clear()
+        cls._python_installations.cache_clear()
 
 
 class TaskExecutor:
     """Execute system tasks and commands"""
     
+    # Seconds a system status snapshot is reused by back-to-back callers
+    STATUS_TTL = 1.0
+    
     def __init__(self):
         self.system_info = SystemInfo()
         self.os_info = self.system_info.get_os_info()
-        self.is_windows = self.os_info["system"] == "Windows"
+        self.is_windows = _IS_WINDOWS
+        self._ps = _POWERSHELL if self.is_windows else None
+        self._path_cache: Tuple[Optional[str], frozenset] = (None, frozenset())
+        self._status_cache: Tuple[float, Optional[Dict[str, Any]]] = (0.0, None)
+        # Root of the drive we run from (C:\ on Windows, / elsewhere)
+        self._disk_root = os.path.abspath(os.sep)
+        # psutil is imported here rather than at module level so importing this
+        # module for TaskSolver doesn't load it; prime its CPU counter so later
+        # readings don't have to block
+        import psutil
+        psutil.cpu_percent(interval=None)
+    
+    def _path_key(self, path: str) -> str:
+        """Form of a PATH entry used for comparison (case-insensitive on Windows)"""
+        path = path.rstrip("\\/") or path
+        return path.lower() if self.is_windows else path
+    
+    def _in_path(self, path: str) -> bool:
+        """Whether path is already an entry of PATH"""
+        current_path = os.environ.get("PATH", "")
+        cached_for, entries = self._path_cache
+        # Rebuilt only when PATH itself has changed
+        if cached_for != current_path:
+            entries = frozenset(self._path_key(p) for p in current_path.split(os.pathsep) if p)
+            self._path_cache = (current_path, entries)
+        return self._path_key(path) in entries
     
     def add_to_path(self, path_to_add: str, permanent: bool = True) -> Dict[str, Any]:
         """Add a directory to the system PATH"""
@@ -129,9 +410,7 @@ class TaskExecutor:
             if not os.path.exists(path_to_add):
                 return {"success": False, "error": f"Path does not exist: {path_to_add}"}
             
-            current_path = os.environ.get("PATH", "")
-            
-            if path_to_add in current_path:
+            if self._in_path(path_to_add):
                 return {"success": True, "message": "Path already in PATH", "already_exists": True}
             
             if self.is_windows:
@@ -143,23 +422,62 @@ class TaskExecutor:
             logger.error(f"Error adding to PATH: {e}")
             return {"success": False, "error": str(e)}
     
+    def add_many_to_path(self, paths: List[str], permanent: bool = True) -> Dict[str, Any]:
+        """Add several directories to the system PATH with a single write"""
+        try:
+            resolved = list(dict.fromkeys(str(Path(p).resolve()) for p in paths))
+            
+            missing = [p for p in resolved if not os.path.exists(p)]
+            if missing:
+                return {"success": False, "error": f"Path does not exist: {', '.join(missing)}"}
+            
+            new_paths = [p for p in resolved if not self._in_path(p)]
+            
+            if not new_paths:
+                return {"success": True, "message": "Paths already in PATH", "already_exists": True}
+            if len(new_paths) == 1:
+                return self.add_to_path(new_paths[0], permanent)
+            
+            if self.is_windows and permanent:
+                # One PowerShell statement for every directory
+                quoted = ", ".join("'" + p.replace("'", "''") + "'" for p in new_paths)
+                ok, output = self._ps.run(
+                    f"$p = $env:PATH; foreach ($d in @({quoted})) {{ $p += ';' + $d }}; "
+                    f"[Environment]::SetEnvironmentVariable('PATH', $p, 'Machine')"
+                )
+                if ok:
+                    return {"success": True, "message": f"Added {', '.join(new_paths)} to system PATH"}
+                return {"success": False, "error": f"Failed to add to system PATH: {output}"}
+            
+            # Session and profile updates don't spawn anything, so add them one by one
+            add = self._add_to_path_windows if self.is_windows else self._add_to_path_unix
+            results = [add(p, permanent) for p in new_paths]
+            failed = [r["error"] for r in results if not r["success"]]
+            if failed:
+                return {"success": False, "error": "; ".join(failed)}
+            return {"success": True, "message": "; ".join(r["message"] for r in results)}
+            
+        except Exception as e:
+            logger.error(f"Error adding to PATH: {e}")
+            return {"success": False, "error": str(e)}
+    
     def _add_to_path_windows(self, path_to_add: str, permanent: bool) -> Dict[str, Any]:
         """Add to PATH on Windows"""
         try:
             if permanent:
                 # Add to system PATH permanently
-                result = subprocess.run([
-                    "powershell", "-Command",
-                    f"[Environment]::SetEnvironmentVariable('PATH', $env:PATH + ';{path_to_add}', 'Machine')"
-                ], capture_output=True, text=True, shell=True)
+                quoted = path_to_add.replace("'", "''")
+                ok, output = self._ps.run(
+                    f"[Environment]::SetEnvironmentVariable('PATH', $env:PATH + ';{quoted}', 'Machine')"
+                )
                 
-                if result.returncode == 0:
+                if ok:
                     return {"success": True, "message": f"Added {path_to_add} to system PATH"}
                 else:
-                    return {"success": False, "error": f"Failed to add to system PATH: {result.stderr}"}
+                    return {"success": False, "error": f"Failed to add to system PATH: {output}"}
             else:
                 # Add to current session only
-                os.environ["PATH"] = os.environ.get("PATH", "") + ";" + path_to_add
+                _set_session_path(os.environ.get("PATH", "") + ";" + path_to_add)
                 return {"success": True, "message": f"Added {path_to_add} to current session PATH"}
                 
         except Exception as e:
@@ -184,7 +502,7 @@ class TaskExecutor:
                 return {"success": True, "message": f"Added {path_to_add} to {shell_profile}"}
             else:
                 # Add to current session
-                os.environ["PATH"] = os.environ.get("PATH", "") + ":" + path_to_add
+                _set_session_path(os.environ.get("PATH", "") + ":" + path_to_add)
                 return {"success": True, "message": f"Added {path_to_add} to current session PATH"}
                 
         except Exception as e:
@@ -192,18 +510,24 @@ class TaskExecutor:
     
     def install_python_package(self, package_name: str, upgrade: bool = False) -> Dict[str, Any]:
         """Install a Python package using pip"""
+        return self.install_python_packages([package_name], upgrade)
+    
+    def install_python_packages(self, package_names: List[str], upgrade: bool = False) -> Dict[str, Any]:
+        """Install several Python packages with a single pip run"""
+        names = ", ".join(package_names)
         try:
-            cmd = [sys.executable, "-m", "pip", "install"]
+            # Skip prompts and pip's own version check against PyPI
+            cmd = [sys.executable, "-m", "pip", "install", "--no-input", "--disable-pip-version-check"]
             if upgrade:
                 cmd.append("--upgrade")
-            cmd.append(package_name)
+            cmd.extend(package_names)
             
             result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
             
             if result.returncode == 0:
-                return {"success": True, "message": f"Successfully installed {package_name}"}
+                return {"success": True, "message": f"Successfully installed {names}"}
             else:
-                return {"success": False, "error": f"Failed to install {package_name}: {result.stderr}"}
+                return {"success": False, "error": f"Failed to install {names}: {result.stderr}"}
                 
         except subprocess.TimeoutExpired:
             return {"success": False, "error": "Installation timed out"}
@@ -231,9 +555,30 @@ class TaskExecutor:
         except Exception as e:
             return {"success": False, "error": str(e)}
     
-    def run_command(self, command: str, shell: bool = True, timeout: int = 30) -> Dict[str, Any]:
-        """Run a system command"""
+    @staticmethod
+    def _direct_argv(command: str) -> Optional[List[str]]:
+        """Split a plain "program args" command into argv, or None when it needs
+        a shell (metacharacters, or a shell builtin such as dir or echo)"""
+        if _SHELL_METACHARACTERS.intersection(command):
+            return None
+        argv = command.split()
+        if not argv or shutil.which(argv[0]) is None:
+            return None
+        return argv
+    
+    def run_command(self, command: Union[str, List[str]], shell: Optional[bool] = None,
+                    timeout: int = 30) -> Dict[str, Any]:
+        """Run a system command, skipping the shell when it isn't needed"""
         try:
+            if shell is None:
+                shell = False
+                if isinstance(command, str):
+                    argv = self._direct_argv(command)
+                    if argv is None:
+                        shell = True
+                    else:
+                        command = argv
+            
             result = subprocess.run(
                 command, 
                 shell=shell, 
@@ -254,18 +599,23 @@ class TaskExecutor:
         except Exception as e:
             return {"success": False, "error": str(e)}
     
-    def get_system_status(self) -> Dict[str, Any]:
-        """Get comprehensive system status"""
+    def get_system_status(self, force: bool = False) -> Dict[str, Any]:
+        """Get comprehensive system status; force skips the cached snapshot"""
+        import psutil
+        fetched_at, status = self._status_cache
+        if not force and status is not None and time.monotonic() - fetched_at < self.STATUS_TTL:
+            return copy.deepcopy(status)
         try:
             # CPU and Memory
-            cpu_percent = psutil.cpu_percent(interval=1)
+            # Usage since the previous reading (or since __init__), without sleeping
+            cpu_percent = psutil.cpu_percent(interval=None)
             memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
+            disk = psutil.disk_usage(self._disk_root)
             
             # Network
             network = psutil.net_io_counters()
             
-            return {
+            status = {
                 "cpu_percent": cpu_percent,
                 "memory": {
                     "total": memory.total,
@@ -288,12 +638,28 @@ class TaskExecutor:
                 "os_info": self.os_info,
                 "python_installations": self.system_info.get_python_installations()
             }
+            self._status_cache = (time.monotonic(), status)
+            # Callers get their own copy; the snapshot is shared until it expires
+            return copy.deepcopy(status)
             
         except Exception as e:
             logger.error(f"Error getting system status: {e}")
             return {"error": str(e)}
 
 
+@dataclass(frozen=True)
+class ParsedTask:
+    """A task description split into words once for all the solvers"""
+    raw: str
+    words: Tuple[str, ...]
+    lower_words: Tuple[str, ...]
+    
+    @classmethod
+    def parse(cls, task_description: str) -> "ParsedTask":
+        words = tuple(task_description.split())
+        return cls(task_description, words, tuple(word.lower() for word in words))
+
+
 class TaskSolver:
     """High-level task solver that combines RAG with task execution"""
     
@@ -309,15 +675,16 @@ class TaskSolver:
             
             # Analyze the task
             task_analysis = self._analyze_task(task_description, context)
+            parsed = ParsedTask.parse(task_description)
             
             if task_analysis["task_type"] == "path_addition":
-                return self._solve_path_addition_task(task_description, context)
+                return self._solve_path_addition_task(parsed, context)
             elif task_analysis["task_type"] == "python_setup":
-                return self._solve_python_setup_task(task_description, context)
+                return self._solve_python_setup_task(parsed, context)
             elif task_analysis["task_type"] == "package_installation":
-                return self._solve_package_installation_task(task_description, context)
+                return self._solve_package_installation_task(parsed, context)
             elif task_analysis["task_type"] == "system_command":
-                return self._solve_system_command_task(task_description, context)
+                return self._solve_system_command_task(parsed, context)
             else:
                 return {
                     "success": False,
@@ -331,48 +698,41 @@ class TaskSolver:
     
     def _analyze_task(self, task_description: str, context: str) -> Dict[str, Any]:
         """Analyze the task to determine its type and requirements"""
-        task_lower = task_description.lower()
-        
-        # Check for path-related tasks
-        if any(keyword in task_lower for keyword in ["add to path", "path", "environment variable", "env"]):
-            return {"task_type": "path_addition", "confidence": 0.9}
-        
-        # Check for Python setup tasks
-        if any(keyword in task_lower for keyword in ["python", "pip", "virtual environment", "venv"]):
-            return {"task_type": "python_setup", "confidence": 0.8}
-        
-        # Check for package installation
-        if any(keyword in task_lower for keyword in ["install", "package", "pip install"]):
-            return {"task_type": "package_installation", "confidence": 0.8}
-        
-        # Check for system commands
-        if any(keyword in task_lower for keyword in ["run", "execute", "command", "cmd", "powershell"]):
-            return {"task_type": "system_command", "confidence": 0.7}
+        # Highest-priority category found anywhere in the task wins
+        best = None
+        for match in _TASK_KEYWORDS_RE.finditer(task_description):
+            rank = _TASK_PRIORITY[match.lastgroup]
+            if best is None or rank < best:
+                best = rank
+                if rank == 0:
+                    break
+        
+        if best is not None:
+            task_type, confidence = _TASK_TYPES[best]
+            return {"task_type": task_type, "confidence": confidence}
         
         return {"task_type": "unknown", "confidence": 0.0}
     
-    def _solve_path_addition_task(self, task_description: str, context: str) -> Dict[str, Any]:
+    def _solve_path_addition_task(self, parsed: ParsedTask, context: str) -> Dict[str, Any]:
         """Solve path addition tasks"""
         # Extract path from task description
-        words = task_description.split()
-        path_candidates = []
-        
-        for i, word in enumerate(words):
-            if word.lower() in ["add", "to", "path"] and i + 1 < len(words):
-                # Look for path-like strings
-                for j in range(i + 1, min(i + 3, len(words))):
-                    candidate = words[j]
-                    if os.path.exists(candidate) or ":" in candidate:
-                        path_candidates.append(candidate)
+        # The first path-like word after "add", "to" or "path"; add_to_path
+        # checks that it exists, so nothing is probed on disk here
+        path_to_add = None
+        anchored = False
+        for word, lower in zip(parsed.words, parsed.lower_words):
+            if anchored and _PATHLIKE_RE.match(word):
+                path_to_add = word
+                break
+            anchored = anchored or lower in _PATH_ANCHORS
         
-        if not path_candidates:
+        if path_to_add is None:
             return {
                 "success": False,
                 "error": "Could not identify path to add",
                 "suggestions": ["Please specify the exact path you want to add to PATH"]
             }
         
-        path_to_add = path_candidates[0]
         result = self.executor.add_to_path(path_to_add, permanent=True)
         
         if result["success"]:
@@ -381,7 +741,7 @@ class TaskSolver:
         
         return result
     
-    def _solve_python_setup_task(self, task_description: str, context: str) -> Dict[str, Any]:
+    def _solve_python_setup_task(self, parsed: ParsedTask, context: str) -> Dict[str, Any]:
         """Solve Python setup tasks"""
         # Get current Python installations
         python_installations = self.executor.system_info.get_python_installations()
@@ -400,14 +760,13 @@ class TaskSolver:
                 if py_install["version"] > best_python["version"]:
                     best_python = py_install
         
-        # Add Python to PATH if not already there
+        # Add Python, and its Scripts directory if it exists, to PATH in one write
         python_dir = os.path.dirname(best_python["path"])
-        path_result = self.executor.add_to_path(python_dir, permanent=True)
-        
-        # Add Scripts directory if it exists
+        dirs_to_add = [python_dir]
         scripts_dir = os.path.join(python_dir, "Scripts")
         if os.path.exists(scripts_dir):
-            scripts_result = self.executor.add_to_path(scripts_dir, permanent=True)
+            dirs_to_add.append(scripts_dir)
+        path_result = self.executor.add_many_to_path(dirs_to_add, permanent=True)
         
         return {
             "success": True,
@@ -418,15 +777,30 @@ class TaskSolver:
             "path_added": path_result["success"]
         }
     
-    def _solve_package_installation_task(self, task_description: str, context: str) -> Dict[str, Any]:
+    def _solve_package_installation_task(self, parsed: ParsedTask, context: str) -> Dict[str, Any]:
         """Solve package installation tasks"""
         # Extract package name from task description
-        words = task_description.split()
+        # Names after "install" joined by "," or "and", so "install numpy and
+        # pandas" installs both in one pip run; the list ends at the first
+        # word that isn't a separated package name ("install numpy for ...")
         package_candidates = []
         
-        for i, word in enumerate(words):
-            if word.lower() in ["install", "pip", "install"] and i + 1 < len(words):
-                package_candidates.append(words[i + 1])
+        if "install" in parsed.lower_words:
+            start = parsed.lower_words.index("install") + 1
+            expect_name = True
+            for word, lower in zip(parsed.words[start:], parsed.lower_words[start:]):
+                name, lower = word.rstrip(","), lower.rstrip(",")
+                if lower == "and" and package_candidates:
+                    expect_name = True
+                    continue
+                if not expect_name:
+                    break
+                if lower in _PACKAGE_FILLER:
+                    continue
+                if lower in _PACKAGE_STOPWORDS or not _PACKAGE_NAME_RE.match(name):
+                    break
+                package_candidates.append(name)
+                expect_name = word.endswith(",")
         
         if not package_candidates:
             return {
@@ -435,23 +809,23 @@ class TaskSolver:
                 "suggestions": ["Please specify the package name", "Example: install numpy"]
             }
         
-        package_name = package_candidates[0]
-        result = self.executor.install_python_package(package_name)
+        package_candidates = list(dict.fromkeys(package_candidates))
+        result = self.executor.install_python_packages(package_candidates)
         
         if result["success"]:
             result["task_solved"] = True
-            result["action_taken"] = f"Installed Python package: {package_name}"
+            result["action_taken"] = f"Installed Python package: {', '.join(package_candidates)}"
         
         return result
     
-    def _solve_system_command_task(self, task_description: str, context: str) -> Dict[str, Any]:
+    def _solve_system_command_task(self, parsed: ParsedTask, context: str) -> Dict[str, Any]:
         """Solve system command tasks"""
         # Extract command from task description
-        words = task_description.split()
+        words = parsed.words
         command_candidates = []
         
-        for i, word in enumerate(words):
-            if word.lower() in ["run", "execute", "command"] and i + 1 < len(words):
+        for i, word in enumerate(parsed.lower_words):
+            if word in _COMMAND_ANCHORS and i + 1 < len(words):
                 # Get the rest of the words as command
                 command = " ".join(words[i + 1:])
                 command_candidates.append(command)
@@ -6,6 +6,7 @@ This creates a mock LLM for testing the CLI interface.
 
 import sys
 import os
+import re
 from pathlib import Path
 
 # Add the jarvis package to the path
@@ -14,6 +15,10 @@ sys.path.insert(0, str(Path(__file__).parent))
 from jarvis.chat import LocalLlm, ChatSession
 from rich.console import Console
 
+# A word plus the whitespace after it, so tokens join back into the response
+_TOKEN_RE = re.compile(r"\S+\s*")
+
+
 class MockLlm:
     """Mock LLM for testing the interface without requiring a real model."""
     
@@ -38,12 +43,7 @@ class MockLlm:
             response = f"I understand you said: '{last_message}'\n\nThis is a mock response. In a real setup, you would need a GGUF model file to get actual LLM responses."
         
         # Stream the response word by word
-        words = response.split()
-        for i, word in enumerate(words):
-            if i == 0:
-                yield word
-            else:
-                yield " " + word
+        yield from _TOKEN_RE.findall(response)
 
 def main():
     """Run a demo of Terminal Jarvis with mock LLM."""
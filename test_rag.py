@@ -95,6 +95,67 @@ def test_task_automation():
         traceback.print_exc()
         return False
 
+# (task, type from the old substring checks, type from _analyze_task). They
+# differ only where a keyword sat inside an unrelated word
+_TASK_CLASSIFICATION_CASES = [
+    ("add C:\\tools to path", "path_addition", "path_addition"),
+    ("set an environment variable", "path_addition", "path_addition"),
+    ("set PYTHONPATH for this project", "path_addition", "path_addition"),
+    ("fix the systempath entry", "path_addition", "path_addition"),
+    ("create a venv", "path_addition", "python_setup"),
+    ("install python 3.11", "python_setup", "python_setup"),
+    ("pip install requests", "python_setup", "python_setup"),
+    ("install numpy", "package_installation", "package_installation"),
+    ("reinstall numpy", "package_installation", "package_installation"),
+    ("uninstall foo", "package_installation", "package_installation"),
+    ("run the build script", "system_command", "system_command"),
+    ("rerun the tests", "system_command", "system_command"),
+    ("execute a command in powershell", "system_command", "system_command"),
+    ("prune old docker images", "system_command", "unknown"),
+    ("what time is it", "unknown", "unknown"),
+]
+
+def _legacy_task_type(task):
+    """Task type from the substring checks _analyze_task used to make"""
+    task_lower = task.lower()
+    if any(k in task_lower for k in ["add to path", "path", "environment variable", "env"]):
+        return "path_addition"
+    if any(k in task_lower for k in ["python", "pip", "virtual environment", "venv"]):
+        return "python_setup"
+    if any(k in task_lower for k in ["install", "package", "pip install"]):
+        return "package_installation"
+    if any(k in task_lower for k in ["run", "execute", "command", "cmd", "powershell"]):
+        return "system_command"
+    return "unknown"
+
+def test_task_classification():
+    """Test task classification against the old substring checks"""
+    print("\nTesting Task Classification...")
+    
+    try:
+        from jarvis.task_automation import TaskSolver
+        
+        solver = TaskSolver(None, None)
+        failures = 0
+        for task, old_type, new_type in _TASK_CLASSIFICATION_CASES:
+            legacy = _legacy_task_type(task)
+            current = solver._analyze_task(task, "")["task_type"]
+            if legacy != old_type or current != new_type:
+                print(f"[ERROR] {task!r}: old {legacy}, now {current}; expected {old_type} -> {new_type}")
+                failures += 1
+        if failures:
+            return False
+        print(f"[OK] {len(_TASK_CLASSIFICATION_CASES)} task descriptions classified as expected")
+        
+        print("[SUCCESS] Task Classification test completed successfully!")
+        return True
+        
+    except Exception as e:
+        print(f"[ERROR] Task Classification test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
 def test_enhanced_chat():
     """Test enhanced chat system"""
     print("\nTesting Enhanced Chat System...")
@@ -127,6 +188,327 @@ def test_enhanced_chat():
         traceback.print_exc()
         return False
 
+def test_chat_session_save():
+    """Test incremental transcript saves"""
+    print("\nTesting Chat Session Save...")
+    
+    try:
+        import json
+        import tempfile
+        from jarvis.chat import ChatSession
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "chat.jsonl"
+            session = ChatSession()
+            
+            def on_disk():
+                with open(path, encoding="utf-8") as f:
+                    return [json.loads(line) for line in f if line.strip()]
+            
+            session.add_user("hello")
+            session.add_assistant("hi")
+            session.save(str(path))
+            session.add_user("how are you?")
+            session.save(str(path))
+            if on_disk() != session.messages:
+                print("[ERROR] Appended save does not match the session")
+                return False
+            print("[OK] New messages appended to the saved transcript")
+            
+            # Removing a saved message and adding another keeps the count
+            # the same, so only a rewrite gets the file right
+            session.messages.pop()
+            session.add_user("what can you do?")
+            session.save(str(path))
+            if on_disk() != session.messages:
+                print("[ERROR] Save after replacing a message left stale lines")
+                return False
+            session.messages.pop()
+            session.save(str(path))
+            if on_disk() != session.messages:
+                print("[ERROR] Save after removing a message left stale lines")
+                return False
+            print("[OK] Removed messages trigger a full rewrite")
+            
+            other = Path(tmp) / "other.jsonl"
+            session.save(str(other))
+            session.add_assistant("plenty")
+            session.save(str(path))
+            if on_disk() != session.messages:
+                print("[ERROR] Save after switching files does not match the session")
+                return False
+            print("[OK] Switching files rewrites the transcript")
+        
+        print("[SUCCESS] Chat Session Save test completed successfully!")
+        return True
+        
+    except Exception as e:
+        print(f"[ERROR] Chat Session Save test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_semantic_query_cache():
+    """Test the LSH tier of the semantic query cache"""
+    print("\nTesting Semantic Query Cache...")
+    
+    try:
+        import numpy as np
+        from jarvis.rag_system import SemanticQueryCache
+        
+        rng = np.random.default_rng(1)
+        query = rng.standard_normal(32)
+        results = [{"id": "a", "text": "cached", "metadata": {}, "distance": 0.1}]
+        # With no exact tier every hit has to come from an LSH bucket
+        cache = SemanticQueryCache(32, max_exact=0)
+        
+        if cache.get(query) is not None:
+            print("[ERROR] Empty cache returned results")
+            return False
+        cache.put(query, results)
+        if cache.get(query * 2.0) is not results:
+            print("[ERROR] Same query direction missed the LSH tier")
+            return False
+        print("[OK] Repeated query hits")
+        
+        if cache.get(-query) is not None:
+            print("[ERROR] Opposite query hit the cache")
+            return False
+        if cache.get(query, key=(3, None)) is not None:
+            print("[ERROR] Query stored under another key hit the cache")
+            return False
+        print("[OK] Different queries and keys miss")
+        
+        cache.clear()
+        if cache.get(query) is not None:
+            print("[ERROR] Cleared cache returned results")
+            return False
+        print("[OK] clear() invalidates cached results")
+        
+        print("[SUCCESS] Semantic Query Cache test completed successfully!")
+        return True
+        
+    except Exception as e:
+        print(f"[ERROR] Semantic Query Cache test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_exact_query_cache_tier():
+    """Test the exact tier in front of the semantic query cache"""
+    print("\nTesting Exact Query Cache Tier...")
+    
+    try:
+        import numpy as np
+        from jarvis.rag_system import SemanticQueryCache
+        
+        rng = np.random.default_rng(2)
+        queries = [rng.standard_normal(32) for _ in range(3)]
+        # With no LSH buckets every hit has to come from the exact tier
+        cache = SemanticQueryCache(32, max_buckets=0, max_exact=2)
+        
+        cache.put(queries[0], ["first"])
+        if cache.get(queries[0]) != ["first"]:
+            print("[ERROR] Repeated query missed the exact tier")
+            return False
+        if cache.get(queries[1]) is not None:
+            print("[ERROR] Unseen query hit the exact tier")
+            return False
+        if cache.get(queries[0], key=(3, None)) is not None:
+            print("[ERROR] Query stored under another key hit the exact tier")
+            return False
+        print("[OK] Exact tier hits repeats and misses everything else")
+        
+        # The least recently used entry goes first
+        cache.put(queries[1], ["second"])
+        cache.get(queries[0])
+        cache.put(queries[2], ["third"])
+        if cache.get(queries[1]) is not None or cache.get(queries[0]) != ["first"]:
+            print("[ERROR] Exact tier did not evict the least recently used entry")
+            return False
+        print("[OK] Exact tier is bounded by max_exact")
+        
+        cache.clear()
+        if cache.get(queries[2]) is not None:
+            print("[ERROR] Cleared exact tier returned results")
+            return False
+        print("[OK] clear() empties the exact tier")
+        
+        print("[SUCCESS] Exact Query Cache Tier test completed successfully!")
+        return True
+        
+    except Exception as e:
+        print(f"[ERROR] Exact Query Cache Tier test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_knowledge_base_query_cache():
+    """Test the knowledge base manager's search result cache"""
+    print("\nTesting Knowledge Base Query Cache...")
+    
+    try:
+        import time
+        from jarvis.knowledge_manager import _QueryCache
+        
+        results = [{"text": "Python is a language", "metadata": {"source": "test"}, "distance": 0.2}]
+        cache = _QueryCache(max_size=2, ttl=60.0)
+        
+        if cache.get("python language") is not None:
+            print("[ERROR] Empty cache returned results")
+            return False
+        cache.put("python language", results, version=1)
+        if cache.get("  Python   LANGUAGE ", version=1) != results:
+            print("[ERROR] Normalized query missed the cache")
+            return False
+        print("[OK] Case and spacing variants of a query hit")
+        
+        hit = cache.get("python language", version=1)
+        hit[0]["text"] = "edited"
+        hit.clear()
+        if cache.get("python language", version=1) != results:
+            print("[ERROR] Editing a hit changed the cached results")
+            return False
+        print("[OK] Hits are copies")
+        
+        # A write to the knowledge base bumps the version
+        if cache.get("python language", version=2) is not None:
+            print("[ERROR] Results from an older version were returned")
+            return False
+        if cache.get("python language", version=1) is not None:
+            print("[ERROR] Stale entry was kept after a version miss")
+            return False
+        print("[OK] A new knowledge base version invalidates entries")
+        
+        cache.put("a", results)
+        cache.put("b", results)
+        cache.get("a")
+        cache.put("c", results)
+        if cache.get("b") is not None or cache.get("a") is None:
+            print("[ERROR] Cache did not evict the least recently used query")
+            return False
+        print("[OK] Cache is bounded by max_size")
+        
+        short = _QueryCache(ttl=0.01)
+        short.put("python", results)
+        time.sleep(0.05)
+        if short.get("python") is not None:
+            print("[ERROR] Expired results were returned")
+            return False
+        print("[OK] Entries expire after the TTL")
+        
+        print("[SUCCESS] Knowledge Base Query Cache test completed successfully!")
+        return True
+        
+    except Exception as e:
+        print(f"[ERROR] Knowledge Base Query Cache test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_embedding_cache():
+    """Test the persistent embedding cache"""
+    print("\nTesting Embedding Cache...")
+    
+    try:
+        import tempfile
+        from jarvis.embed_cache import EmbeddingCache
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "embeddings.db"
+            cache = EmbeddingCache("model-a", path=path, dim=3)
+            cache.put_many(["alpha", "beta"], [[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]])
+            if cache.get_many(["alpha", "gamma", "beta"]) != [[1.0, 2.0, 3.0], None, [4.0, 5.0, 6.0]]:
+                print("[ERROR] Cache lookups did not match what was stored")
+                return False
+            cache.close()
+            print("[OK] Stored vectors round-trip, unknown texts miss")
+            
+            cache = EmbeddingCache("model-a", path=path, dim=3)
+            other = EmbeddingCache("model-b", path=path, dim=3)
+            other.put_many(["alpha"], [[7.0, 8.0, 9.0]])
+            if cache.get_many(["alpha"]) != [[1.0, 2.0, 3.0]]:
+                print("[ERROR] Vectors did not persist across reopening")
+                return False
+            cache.close()
+            print("[OK] Vectors persist and are kept per model")
+            
+            # The model now produces 4-dimensional vectors
+            cache = EmbeddingCache("model-a", path=path, dim=4)
+            if cache.get_many(["alpha", "beta"]) != [None, None]:
+                print("[ERROR] Vectors of the old dimension were returned")
+                return False
+            if other.get_many(["alpha"]) != [[7.0, 8.0, 9.0]]:
+                print("[ERROR] A dimension change purged another model's vectors")
+                return False
+            cache.close()
+            other.close()
+            print("[OK] A dimension change purges only that model's vectors")
+        
+        print("[SUCCESS] Embedding Cache test completed successfully!")
+        return True
+        
+    except Exception as e:
+        print(f"[ERROR] Embedding Cache test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+class _RecordingExecutor:
+    """Stands in for TaskExecutor and records pip installs instead of running them"""
+    
+    def __init__(self):
+        self.installed = None
+    
+    def install_python_packages(self, packages):
+        self.installed = list(packages)
+        return {"success": True}
+
+# (task, packages passed to pip, or None when nothing should be installed)
+_PACKAGE_PARSE_CASES = [
+    ("install numpy", ["numpy"]),
+    ("install numpy, pandas and scipy", ["numpy", "pandas", "scipy"]),
+    ("install numpy for data analysis", ["numpy"]),
+    ("install numpy pandas", ["numpy"]),
+    ("install the requests package", ["requests"]),
+    ("install numpy and numpy", ["numpy"]),
+    ("install requests[security]", ["requests[security]"]),
+    ("install requests[security,socks]==2.31.0", ["requests[security,socks]==2.31.0"]),
+    ("install django==4.2 and celery>=5.3", ["django==4.2", "celery>=5.3"]),
+    ("install numpy<2", ["numpy<2"]),
+    ("install https://example.com/pkg-1.0-py3-none-any.whl", None),
+    ("install git+https://github.com/psf/requests", None),
+    ("install numpy and https://example.com/pkg.whl", ["numpy"]),
+    ("install", None),
+]
+
+def test_package_name_parsing():
+    """Test which package names the installation solver passes to pip"""
+    print("\nTesting Package Name Parsing...")
+    
+    try:
+        from jarvis.task_automation import ParsedTask, TaskSolver
+        
+        failures = 0
+        for task, expected in _PACKAGE_PARSE_CASES:
+            executor = _RecordingExecutor()
+            TaskSolver(None, executor)._solve_package_installation_task(ParsedTask.parse(task), "")
+            if executor.installed != expected:
+                print(f"[ERROR] {task!r}: installed {executor.installed}, expected {expected}")
+                failures += 1
+        if failures:
+            return False
+        print(f"[OK] {len(_PACKAGE_PARSE_CASES)} install requests parsed as expected")
+        
+        print("[SUCCESS] Package Name Parsing test completed successfully!")
+        return True
+        
+    except Exception as e:
+        print(f"[ERROR] Package Name Parsing test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
 def main():
     """Run all tests"""
     print("=" * 60)
@@ -136,7 +518,14 @@ def main():
     tests = [
         test_rag_system,
         test_task_automation,
-        test_enhanced_chat
+        test_task_classification,
+        test_enhanced_chat,
+        test_chat_session_save,
+        test_semantic_query_cache,
+        test_exact_query_cache_tier,
+        test_knowledge_base_query_cache,
+        test_embedding_cache,
+        test_package_name_parsing
     ]
     
     passed = 0